@@ -0,0 +1,369 @@
+"""Query-plan capture and index advisor.
+
+    The `QueryPlanCollector` listens on the engine and keeps every statement
+that run during the test or benchmark, then it runs `EXPLAIN QUERY PLAN`
+(SQLite) or `EXPLAIN` (Postgres) on each of them and flags the full scans, the
+temp B-tree sorts, and the foreign keys that do not have an index.
+
+    >>> collector = QueryPlanCollector(Base.metadata)
+    >>> collector.attach(manage.engine)
+    >>> ...  # run the queries
+    >>> issues = await collector.analyze(manage.engine)
+    >>> print(format_report(issues))
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    Engine,
+    MetaData,
+    Table,
+    UniqueConstraint,
+    event,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.selectable import Alias, Join
+
+# NOTE: A connection info key that mark the explain execution, so the collector
+#   does not capture its own statements.
+EXPLAIN_FLAG: str = "self_orm_explain"
+
+SQLITE_SCAN: re.Pattern = re.compile(
+    r"^SCAN (?:TABLE )?(?P<table>\w+)(?P<rest>.*)$"
+)
+SQLITE_TEMP_BTREE: re.Pattern = re.compile(
+    r"^USE TEMP B-TREE FOR (?P<clause>.+)$"
+)
+POSTGRES_SEQ_SCAN: re.Pattern = re.compile(r"Seq Scan on (?P<table>\w+)")
+POSTGRES_SORT: re.Pattern = re.compile(r"^\s*(?:->\s*)?Sort\b")
+
+
+@dataclass
+class PlanIssue:
+    """A performance issue that found from the query plan or the metadata.
+
+    :param kind: A kind of issue, `full_scan`, `temp_btree`, or
+        `missing_fk_index`.
+    :param table: A table name of this issue.
+    :param detail: A plan line or a detail message.
+    :param statement: A SQL statement that make this issue.
+    :param suggestion: An index definition that can fix this issue.
+    :param ddl: A create index DDL of the suggestion.
+    """
+
+    kind: str
+    table: str
+    detail: str
+    statement: Optional[str] = None
+    suggestion: Optional[str] = None
+    ddl: Optional[str] = None
+
+
+def base_table(from_: Any) -> Optional[Table]:
+    """Return the base table of the table or its alias, like the alias of the
+    secondary table that the ORM relationship loader uses.
+    """
+    while isinstance(from_, Alias):
+        from_ = from_.element
+    return from_ if isinstance(from_, Table) else None
+
+
+def join_clauses(froms: list[Any]) -> list[Any]:
+    """Return the ON clauses of all joins in the FROM list."""
+    return [
+        elem.onclause
+        for from_ in froms
+        for elem in visitors.iterate(from_)
+        if isinstance(elem, Join)
+    ]
+
+
+def table_columns(
+    clauses: list[Any],
+    table: str,
+    aliases: Optional[dict[str, str]] = None,
+) -> list[Column]:
+    """Return the unique list of columns of the table that use in the clauses.
+    The table is the name on the query plan, so it matches the table name or
+    its alias name, and it returns the columns of the base table.
+
+    :param aliases: A mapping of the anonymous alias name to its rendered name
+        on the SQL statement, like `associate_roles_policies_1`.
+    """
+    aliases = aliases or {}
+    columns: list[Column] = []
+    for clause in clauses:
+        if clause is None:
+            continue
+        for elem in visitors.iterate(clause):
+            if not isinstance(elem, Column) or elem.table is None:
+                continue
+            base: Optional[Table] = base_table(elem.table)
+            name: str = aliases.get(elem.table.name, elem.table.name)
+            if base is None or name != table:
+                continue
+            column: Optional[Column] = base.c.get(elem.key)
+            if column is not None and not any(
+                c.name == column.name for c in columns
+            ):
+                columns.append(column)
+    return columns
+
+
+def suggest_index(
+    table: Table, columns: list[Column], dialect: Any
+) -> tuple[str, str]:
+    """Return the index definition for `Base.metadata` and its DDL."""
+    names: list[str] = [c.name for c in columns]
+    name: str = f"ix_{table.name}_{'_'.join(names)}"
+    preparer = dialect.identifier_preparer
+    ddl: str = (
+        f"CREATE INDEX {preparer.quote(name)} "
+        f"ON {preparer.format_table(table)} "
+        f"({', '.join(preparer.quote(n) for n in names)})"
+    )
+    cols: str = ", ".join(f"{table.name}.c.{n}" for n in names)
+    return f'Index("{name}", {cols})', ddl
+
+
+def indexed_columns(table: Table) -> list[list[str]]:
+    """Return the column names of the primary key, the indexes, and the unique
+    constraints of the table.
+    """
+    leading: list[list[str]] = [[c.name for c in table.primary_key.columns]]
+    leading.extend([c.name for c in idx.columns] for idx in table.indexes)
+    leading.extend(
+        [c.name for c in cons.columns]
+        for cons in table.constraints
+        if isinstance(cons, UniqueConstraint)
+    )
+    return leading
+
+
+def missing_fk_indexes(metadata: MetaData, dialect: Any) -> list[PlanIssue]:
+    """Return the issue for each foreign key that does not have any index or
+    constraint that start with its columns.
+    """
+    issues: list[PlanIssue] = []
+    for table in metadata.sorted_tables:
+        leading: list[list[str]] = indexed_columns(table)
+        for fk in table.foreign_key_constraints:
+            names: list[str] = [c.name for c in fk.columns]
+            if any(cols[:len(names)] == names for cols in leading):
+                continue
+            suggestion, ddl = suggest_index(
+                table, [table.c[n] for n in names], dialect
+            )
+            issues.append(
+                PlanIssue(
+                    kind="missing_fk_index",
+                    table=table.name,
+                    detail=(
+                        f"Foreign key {table.name}({', '.join(names)}) does "
+                        f"not have an index"
+                    ),
+                    suggestion=suggestion,
+                    ddl=ddl,
+                )
+            )
+    return issues
+
+
+class QueryPlanCollector:
+    """A Query Plan Collector that capture the statements on the engine and
+    analyze their query plans.
+
+    :param metadata: A metadata that use to check the foreign key indexes and
+        to build the index suggestions.
+    """
+
+    def __init__(self, metadata: MetaData):
+        self.metadata: MetaData = metadata
+        self.statements: dict[str, tuple[Any, Any, dict[str, str]]] = {}
+        self._engines: list[Engine] = []
+
+    def attach(self, engine: Union[AsyncEngine, Engine]):
+        """Start capture the statements that execute on this engine."""
+        engine = getattr(engine, "sync_engine", engine)
+        event.listen(engine, "before_cursor_execute", self._capture)
+        self._engines.append(engine)
+
+    def detach(self):
+        """Stop capture the statements on all attached engines."""
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._capture)
+        self._engines = []
+
+    def clear(self):
+        self.statements = {}
+
+    def _capture(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        if executemany or conn.info.get(EXPLAIN_FLAG):
+            return
+        head: list[str] = statement.lstrip().split(None, 1)
+        if not head or head[0].upper() not in (
+            "SELECT", "UPDATE", "DELETE", "WITH",
+        ):
+            return
+        if statement not in self.statements:
+            compiled = context.compiled
+
+            # NOTE: The ORM statement builds its core statement with the new
+            #   aliases on compile, so it uses the statement of the compile
+            #   state that matches the rendered names.
+            state = getattr(compiled, "compile_state", None)
+            stmt = getattr(state, "statement", None)
+            if stmt is None and compiled is not None:
+                stmt = compiled.statement
+            self.statements[statement] = (
+                parameters,
+                stmt,
+                # NOTE: The anonymous aliases, like the secondary table of the
+                #   relationship loader, render their names on compile.
+                {
+                    name: rendered
+                    for (kind, name), rendered in getattr(
+                        compiled, "truncated_names", {}
+                    ).items()
+                    if kind == "alias"
+                },
+            )
+
+    async def analyze(self, engine: AsyncEngine) -> list[PlanIssue]:
+        """Run the explain on all captured statements and return the issues
+        with the foreign key issues of the metadata.
+        """
+        async with engine.connect() as conn:
+            return await conn.run_sync(self.analyze_sync)
+
+    def analyze_sync(self, conn: Connection) -> list[PlanIssue]:
+        dialect = conn.dialect
+        issues: list[PlanIssue] = []
+        conn.info[EXPLAIN_FLAG] = True
+        try:
+            for statement, (params, stmt, aliases) in self.statements.items():
+                # NOTE: The last column of the SQLite plan row is the detail,
+                #   and the Postgres plan row has only one text column.
+                explain: str = (
+                    "EXPLAIN QUERY PLAN"
+                    if dialect.name == "sqlite"
+                    else "EXPLAIN"
+                )
+                lines: list[str] = [
+                    row[-1]
+                    for row in conn.exec_driver_sql(
+                        f"{explain} {statement}", params
+                    )
+                ]
+                issues.extend(
+                    self._parse(lines, statement, stmt, aliases, dialect)
+                )
+            conn.rollback()
+        finally:
+            conn.info.pop(EXPLAIN_FLAG, None)
+        issues.extend(missing_fk_indexes(self.metadata, dialect))
+        return issues
+
+    def _parse(
+        self,
+        lines: list[str],
+        statement: str,
+        stmt: Any,
+        aliases: dict[str, str],
+        dialect: Any,
+    ) -> list[PlanIssue]:
+        issues: list[PlanIssue] = []
+        all_froms: list[Any] = list(
+            getattr(stmt, "get_final_froms", lambda: [])()
+        )
+        froms: list[Table] = [t for t in all_froms if isinstance(t, Table)]
+        for line in lines:
+            line = line.strip()
+            table: Optional[str] = None
+            kind: Optional[str] = None
+            columns: list[Column] = []
+
+            m = SQLITE_SCAN.match(line) or POSTGRES_SEQ_SCAN.search(line)
+            if m:
+                if "INDEX" in m.groupdict().get("rest", ""):
+                    continue
+                table = m.group("table")
+                kind = "full_scan"
+
+                # NOTE: The scan without any filter or join condition of this
+                #   table is the intention of the statement, like
+                #   `get_all_products`.
+                columns = table_columns(
+                    [
+                        getattr(stmt, "whereclause", None),
+                        *join_clauses(all_froms),
+                    ],
+                    table,
+                    aliases,
+                )
+                if not columns:
+                    continue
+
+                # NOTE: The columns that already lead an index, like the first
+                #   column of the composite primary key of the secondary
+                #   table, do not help this scan.
+                leading: set[str] = {
+                    cols[0]
+                    for cols in indexed_columns(columns[0].table)
+                    if cols
+                }
+                columns = [
+                    c for c in columns if c.name not in leading
+                ] or columns
+                table = columns[0].table.name
+
+            elif SQLITE_TEMP_BTREE.match(line) or POSTGRES_SORT.match(line):
+                kind = "temp_btree"
+                if froms:
+                    table = froms[0].name
+                    columns = table_columns(
+                        list(getattr(stmt, "_order_by_clauses", ())), table
+                    )
+
+            if kind is None:
+                continue
+
+            suggestion: Optional[str] = None
+            ddl: Optional[str] = None
+            if columns:
+                suggestion, ddl = suggest_index(
+                    columns[0].table, columns, dialect
+                )
+            issues.append(
+                PlanIssue(
+                    kind=kind,
+                    table=table or "",
+                    detail=line,
+                    statement=statement,
+                    suggestion=suggestion,
+                    ddl=ddl,
+                )
+            )
+        return issues
+
+
+def format_report(issues: list[PlanIssue]) -> str:
+    """Return the readable report of the issues for print on the CI log."""
+    if not issues:
+        return "Query plan: no issue found"
+    lines: list[str] = [f"Query plan: found {len(issues)} issue(s)"]
+    for issue in issues:
+        lines.append(f"- [{issue.kind}] {issue.table}: {issue.detail}")
+        if issue.statement:
+            statement: str = " ".join(issue.statement.split())
+            lines.append(f"    statement: {statement}")
+        if issue.suggestion:
+            lines.append(f"    suggestion: {issue.suggestion}")
+            lines.append(f"    ddl: {issue.ddl}")
+    return "\n".join(lines)
@@ -6,14 +6,22 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from ..exceptions import DatabaseManageException
+from ..stats import StatisticsMixin
 
 
-class AsyncManage:
+class AsyncManage(StatisticsMixin):
     def __init__(self):
         self.engine: Optional[AsyncEngine] = None
         self.async_session_maker: Optional[async_sessionmaker] = None
 
-    def init(self, url: str, echo: bool = False):
+    def init(
+        self,
+        url: str,
+        echo: bool = False,
+        count_ttl: float = 30.0,
+        analyze_threshold: Optional[int] = None,
+        analyze_interval: float = 60.0,
+    ):
         # NOTE: For Postgres, we need to use aiosqlite as the async driver
         #   - Using pool-class to handle connection pooling for concurrent
         #     access
@@ -33,6 +41,12 @@ class AsyncManage:
             expire_on_commit=False,
             bind=self.engine,
         )
+
+        self.init_statistics(
+            count_ttl=count_ttl,
+            analyze_threshold=analyze_threshold,
+            analyze_interval=analyze_interval,
+        )
         print("Init database manage success")
 
     async def initialize(self):
@@ -42,15 +56,23 @@ class AsyncManage:
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
+        self.start_statistics()
+
     async def close(self):
         """Close all connections in the engine"""
         if self.engine is None:
             raise DatabaseManageException(
                 "DatabaseSessionManager is not initialized"
             )
-        await self.engine.dispose()
-        self.engine = None
-        self.async_session_maker = None
+        try:
+            await self.stop_statistics()
+        finally:
+            try:
+                await self.engine.dispose()
+            finally:
+                self.engine = None
+                self.async_session_maker = None
+                self.row_counter = None
 
     def is_opened(self) -> bool:
         return self.engine is not None
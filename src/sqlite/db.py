@@ -1,19 +1,54 @@
-from typing import Optional
+import asyncio
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Any, Optional, TypeVar, Union
 
+from sqlalchemy import ColumnElement, Executable, Select, func, select
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker, create_async_engine, AsyncEngine
 )
 from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from ..exceptions import DatabaseManageException
+from ..stats import StatisticsMixin
+from .executor import has_aggregate, read_range, split_range
 
+logger = logging.getLogger(__name__)
 
-class AsyncManage:
+T = TypeVar("T")
+
+# NOTE: A statement of the batch mode can be the SQLAlchemy statement, the raw
+#   SQL string, or the pair of raw SQL string and its positional parameters.
+BatchStatement = Union[Executable, str, tuple[str, tuple]]
+
+
+class AsyncManage(StatisticsMixin):
     def __init__(self):
         self.engine: Optional[AsyncEngine] = None
         self.async_session_maker: Optional[async_sessionmaker] = None
+        self.read_workers: Optional[int] = None
+        self.read_executor: Optional[ProcessPoolExecutor] = None
+        self.memory_anchor: Optional[sqlite3.Connection] = None
+        self.snapshot_to: Optional[str] = None
+        self.snapshot_interval: Optional[float] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._snapshot_lock: threading.Lock = threading.Lock()
 
-    def init(self, url: str, echo: bool = False):
+    def init(
+        self,
+        url: str,
+        echo: bool = False,
+        read_workers: Optional[int] = None,
+        count_ttl: float = 30.0,
+        analyze_threshold: Optional[int] = None,
+        analyze_interval: float = 60.0,
+    ):
         # NOTE: For SQLite, we need to use aiosqlite as the async driver
         #   - Using check_same_thread=False to allow multiple threads to access
         #     the db
@@ -36,24 +71,375 @@ class AsyncManage:
             expire_on_commit=False,
             bind=self.engine,
         )
+
+        # NOTE: The process-pool read mode is optional. It uses the `spawn`
+        #   context because the aiosqlite connections already run on the
+        #   background threads, and fork a process that has threads is not safe.
+        if read_workers:
+            self.read_workers = read_workers
+            self.read_executor = ProcessPoolExecutor(
+                max_workers=read_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        self.init_statistics(
+            count_ttl=count_ttl,
+            analyze_threshold=analyze_threshold,
+            analyze_interval=analyze_interval,
+        )
         print("Init database manage success")
 
+    def init_memory(
+        self,
+        name: str = "memory",
+        echo: bool = False,
+        load_from: Optional[str] = None,
+        snapshot_to: Optional[str] = None,
+        snapshot_interval: Optional[float] = None,
+        **kwargs,
+    ):
+        """Initialize with the in-memory database that all pooled connections
+        can see.
+
+            It uses the SQLite `memdb` VFS instead of the shared-cache mode
+        (`mode=memory&cache=shared`) because the shared-cache mode raises
+        `database table is locked` on concurrent writers and does not wait with
+        the busy timeout like the file database.
+
+        :param name: A name of the in-memory database on this process.
+        :param echo: A echo flag that pass to the engine.
+        :param load_from: A SQLite file that will load to the memory at start.
+        :param snapshot_to: A SQLite file that will write the snapshot with the
+            online backup API on close or on the snapshot interval.
+        :param snapshot_interval: A second interval of the background snapshot.
+            It will start with the `initialize` method.
+        :param kwargs: The other arguments that pass to the `init` method, like
+            `count_ttl`, `analyze_threshold`, or `analyze_interval`.
+        """
+        uri: str = f"file:/{name}?vfs=memdb"
+
+        # NOTE: The in-memory database will disappear when the last connection
+        #   close, so this anchor connection keeps it until close this manage.
+        self.memory_anchor = sqlite3.connect(
+            uri, uri=True, check_same_thread=False
+        )
+        if load_from is not None and os.path.exists(load_from):
+            source = sqlite3.connect(load_from)
+            try:
+                source.backup(self.memory_anchor)
+            finally:
+                source.close()
+
+        self.snapshot_to = snapshot_to
+        self.snapshot_interval = snapshot_interval
+        self.init(f"sqlite+aiosqlite:///{uri}&uri=true", echo=echo, **kwargs)
+
     async def initialize(self):
         """Create all tables defined in the models"""
-        from .models import Base
+        from .models import Base, Product
 
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
+        # NOTE: The `create_all` method creates the FTS5 index only with the
+        #   new products table, so it creates the missing index of the existing
+        #   database here.
+        await Product.ensure_search_index(self.async_session_maker)
+
+        if (
+            self.snapshot_to is not None
+            and self.snapshot_interval
+            and self._snapshot_task is None
+        ):
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+
+        self.start_statistics()
+
+    async def snapshot(self, path: Optional[str] = None):
+        """Write the in-memory database to the file with the online backup API
+        on the background thread.
+        """
+        if self.memory_anchor is None:
+            raise DatabaseManageException(
+                "Snapshot support only the in-memory database"
+            )
+        path = path or self.snapshot_to
+        if path is None:
+            raise DatabaseManageException("Snapshot path does not set")
+        await asyncio.to_thread(self._backup, path)
+
+    def _backup(self, path: str):
+        # NOTE: Write to the temp file first and replace it, so the reader of
+        #   this file will not see the half-write snapshot.
+        tmp: str = f"{path}.tmp"
+        with self._snapshot_lock:
+            target = sqlite3.connect(tmp)
+            try:
+                self.memory_anchor.backup(target)
+            finally:
+                target.close()
+            os.replace(tmp, path)
+
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            # NOTE: Keep the loop alive and retry on the next interval if the
+            #   snapshot fails, like the snapshot path is not writable.
+            try:
+                await self.snapshot()
+            except Exception:
+                logger.exception(
+                    "Background snapshot to %s failed", self.snapshot_to
+                )
+
+    async def read_partitioned(
+        self,
+        stmt: Select,
+        pk: ColumnElement,
+        *,
+        partitions: Optional[int] = None,
+        processor: Optional[Callable[[list[tuple]], Any]] = None,
+        combine: Optional[Callable[[list[Any]], Any]] = None,
+    ) -> Any:
+        """Run the read-only statement on the worker processes by split it with
+        the primary key range, and merge the partial results back.
+
+            Each range runs with its own read-only connection on the worker
+        process. If the processor is passed, it will apply to the rows on the
+        worker process, so only its result crosses the process boundary. The
+        processor and the combine functions should be the top-level functions
+        that can pickle.
+
+            The statement should be a plain filter over the rows because each
+        range runs separately, so the statement with LIMIT, OFFSET, ORDER BY,
+        DISTINCT, GROUP BY, or HAVING will raise, and the aggregate statement
+        should pass the `combine` function.
+
+        Warning:
+            Each range reads with its own connection and there is no shared
+        snapshot between them, so the concurrent writes during this read can
+        make the merged result inconsistent, like a row that moves between two
+        ranges or the aggregate that mixes before and after a commit.
+
+        :param stmt: A select statement that want to read.
+        :param pk: An integer primary key column of the statement table.
+        :param partitions: A number of ranges, default is the number of workers.
+        :param processor: A function that apply to the rows of each range.
+        :param combine: A function that merge the list of partial results. If
+            it does not pass, it will chain the rows or return the list of
+            processor results.
+        """
+        if self.read_executor is None:
+            raise DatabaseManageException(
+                "Process-pool read mode does not enable, please pass "
+                "`read_workers` to the init method"
+            )
+
+        database: Optional[str] = self.engine.url.database
+        if (
+            self.memory_anchor is not None
+            or not database
+            or database == ":memory:"
+        ):
+            raise DatabaseManageException(
+                "Process-pool read mode support only the SQLite file database"
+            )
+
+        unsupported: list[str] = [
+            name
+            for name, used in (
+                ("LIMIT", stmt._limit_clause is not None),
+                ("OFFSET", stmt._offset_clause is not None),
+                ("ORDER BY", bool(stmt._order_by_clauses)),
+                ("DISTINCT", bool(stmt._distinct)),
+                ("GROUP BY", bool(stmt._group_by_clauses)),
+                ("HAVING", bool(stmt._having_criteria)),
+            )
+            if used
+        ]
+        if unsupported:
+            raise DatabaseManageException(
+                f"Process-pool read mode does not support the statement with "
+                f"{', '.join(unsupported)} because it runs per key range"
+            )
+        if combine is None and has_aggregate(stmt):
+            raise DatabaseManageException(
+                "Process-pool read mode need the `combine` function for the "
+                "aggregate statement because it returns one partial per range"
+            )
+
+        async with self.engine.connect() as conn:
+            min_id, max_id = (
+                await conn.execute(select(func.min(pk), func.max(pk)))
+            ).one()
+
+        partials: list[Any] = []
+        if min_id is not None:
+            loop = asyncio.get_running_loop()
+            partials = list(
+                await asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            self.read_executor,
+                            read_range,
+                            database,
+                            str(
+                                stmt.where(pk >= start, pk < end).compile(
+                                    dialect=self.engine.dialect,
+                                    compile_kwargs={"literal_binds": True},
+                                )
+                            ),
+                            processor,
+                        )
+                        for start, end in split_range(
+                            min_id, max_id, partitions or self.read_workers
+                        )
+                    )
+                )
+            )
+
+        if combine is not None:
+            return combine(partials)
+        elif processor is None:
+            return list(chain.from_iterable(partials))
+        return partials
+
+    def compile_statement(self, stmt: BatchStatement) -> tuple[str, tuple]:
+        """Compile the batch statement to the raw SQL string and its positional
+        parameters for the sqlite3 connection.
+
+            The parameters pass through the bind processors of their types,
+        like the engine does, so the `DateTime` or `JSON` value writes and
+        matches the same stored value as the normal execution path.
+        """
+        if isinstance(stmt, str):
+            return stmt, ()
+        elif isinstance(stmt, tuple):
+            return stmt
+        compiled = stmt.compile(dialect=self.engine.dialect)
+        state = compiled.construct_expanded_state()
+
+        # NOTE: The expanded state keeps only the processors of the expanded
+        #   IN parameters, so it merges them with the other bind processors.
+        processors: dict[str, Callable[[Any], Any]] = {
+            **compiled._bind_processors,
+            **state.processors,
+        }
+        params: dict[str, Any] = state.parameters
+        return state.statement, tuple(
+            processors[k](params[k]) if k in processors else params[k]
+            for k in state.positiontup
+        )
+
+    async def execute_pipeline(
+        self,
+        fn: Callable[[Callable[[BatchStatement], Any]], T],
+        write: bool = False,
+    ) -> T:
+        """Run the pipeline function on the connection thread of aiosqlite in
+        one hop with one transaction, and commit it if it does not raise.
+
+            The pipeline function receives the `execute` function that run the
+        statement and return the list of row tuples, or the row count for the
+        statement that does not return rows. So the next statement can build
+        from the result of the previous one without going back to the event
+        loop. The statement parameters pass through the SQLAlchemy bind
+        processors, but the rows are still the raw values without the result
+        processing, like the `DateTime` column returns the string.
+
+        :param fn: A sync pipeline function.
+        :param write: A flag that start the transaction with `BEGIN IMMEDIATE`
+            to take the write lock before the first statement. It should set
+            for the pipeline that reads and then writes, so the concurrent
+            writer can not change the rows between them.
+        """
+        if self.engine is None:
+            raise DatabaseManageException(
+                "DatabaseSessionManager is not initialized"
+            )
+
+        def run(conn: sqlite3.Connection) -> T:
+            def execute(stmt: BatchStatement) -> Union[list[tuple], int]:
+                cursor = conn.execute(*self.compile_statement(stmt))
+                try:
+                    if cursor.description is None:
+                        return cursor.rowcount
+                    return cursor.fetchall()
+                finally:
+                    cursor.close()
+
+            # NOTE: The sqlite3 legacy transaction control does not begin the
+            #   transaction before the SELECT statement, so the pipeline begins
+            #   it explicitly to run all statements in one transaction.
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                rs: T = fn(execute)
+                conn.commit()
+                return rs
+            except BaseException:
+                conn.rollback()
+                raise
+
+        async with self.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+
+            # NOTE: aiosqlite does not have the public API for submit the
+            #   function to its connection thread, so it uses the same
+            #   `_execute` method that all its cursor methods use.
+            driver = raw.driver_connection
+            rs: T = await driver._execute(run, driver._conn)
+
+        # NOTE: The pipeline does not go through the SQLAlchemy events, so the
+        #   row counter can not know which tables it writes.
+        self.row_counter.invalidate()
+        return rs
+
+    async def execute_batch(
+        self, statements: list[BatchStatement], write: bool = False
+    ) -> list[Union[list[tuple], int]]:
+        """Run the list of statements on the connection thread of aiosqlite in
+        one hop with one transaction, and return all results together.
+
+        :param statements: A list of statements.
+        :param write: A flag that start the transaction with `BEGIN IMMEDIATE`.
+        """
+        return await self.execute_pipeline(
+            lambda execute: [execute(stmt) for stmt in statements],
+            write=write,
+        )
+
     async def close(self):
         """Close all connections in the engine"""
         if self.engine is None:
             raise DatabaseManageException(
                 "DatabaseSessionManager is not initialized"
             )
-        await self.engine.dispose()
-        self.engine = None
-        self.async_session_maker = None
+        # NOTE: The final snapshot error will raise after all resources close.
+        try:
+            await self._cancel_task(self._snapshot_task)
+            await self.stop_statistics()
+            if self.memory_anchor is not None and self.snapshot_to is not None:
+                await self.snapshot()
+        finally:
+            self._snapshot_task = None
+            self._analyze_task = None
+            try:
+                await self.engine.dispose()
+            finally:
+                self.engine = None
+                self.async_session_maker = None
+                self.row_counter = None
+
+                if self.memory_anchor is not None:
+                    self.memory_anchor.close()
+                    self.memory_anchor = None
+                    self.snapshot_to = None
+                    self.snapshot_interval = None
+
+                if self.read_executor is not None:
+                    await asyncio.to_thread(self.read_executor.shutdown)
+                    self.read_executor = None
+                    self.read_workers = None
 
     def is_opened(self) -> bool:
         return self.engine is not None
@@ -0,0 +1,76 @@
+"""Worker functions for the process-pool read mode of the SQLite `AsyncManage`.
+
+    The `read_range` function will run on the worker process, so it should be
+the top-level function that can pickle, and it should receive and return only
+compact data like the SQL string, the row tuples, or the aggregate values.
+"""
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy import Select
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.functions import FunctionElement
+
+AGGREGATE_FUNCTIONS: frozenset[str] = frozenset(
+    {"count", "sum", "total", "min", "max", "avg", "group_concat"}
+)
+
+# NOTE: Keep the read-only connection per database file on each worker process
+#   for reuse it between the range tasks.
+_CONNECTIONS: dict[str, sqlite3.Connection] = {}
+
+
+def _connect_readonly(database: str) -> sqlite3.Connection:
+    if database not in _CONNECTIONS:
+        _CONNECTIONS[database] = sqlite3.connect(
+            f"{Path(database).resolve().as_uri()}?mode=ro",
+            uri=True,
+        )
+    return _CONNECTIONS[database]
+
+
+def read_range(
+    database: str,
+    sql: str,
+    processor: Optional[Callable[[list[tuple]], Any]] = None,
+) -> Any:
+    """Read the rows of the SQL statement with the read-only connection and
+    return the row tuples or the result of the processor function that apply to
+    these rows.
+    """
+    rows: list[tuple] = _connect_readonly(database).execute(sql).fetchall()
+    if processor is not None:
+        return processor(rows)
+    return rows
+
+
+def split_range(
+    min_id: int, max_id: int, partitions: int
+) -> list[tuple[int, int]]:
+    """Split the inclusive primary key range to the list of half-open ranges
+    with the same size.
+    """
+    total: int = max_id - min_id + 1
+    partitions = max(1, min(partitions, total))
+    size, remain = divmod(total, partitions)
+    ranges: list[tuple[int, int]] = []
+    start: int = min_id
+    for i in range(partitions):
+        end: int = start + size + (1 if i < remain else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def has_aggregate(stmt: Select) -> bool:
+    """Return True if any selected column of the statement use the aggregate
+    function.
+    """
+    return any(
+        isinstance(elem, FunctionElement)
+        and getattr(elem, "name", "").lower() in AGGREGATE_FUNCTIONS
+        for column in stmt.selected_columns
+        for elem in visitors.iterate(column)
+    )
@@ -0,0 +1,174 @@
+import asyncio
+from collections.abc import Iterable
+from typing import Any, Generic, Optional, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import InstrumentedAttribute
+
+from ..exceptions import DatabaseManageException
+from .models import Product, Role, User
+
+T = TypeVar("T")
+
+
+class BatchLoader(Generic[T]):
+    """A DataLoader-style Batch Loader that gather the keys that request on the
+    same event-loop tick, and load them with one chunked `WHERE ... IN (...)`
+    query instead of one query per key. The key column should be the primary
+    key or the unique column of the model.
+
+        The missing keys will return as None, and the same key that request on
+    the same tick will share the same query result. The key coerces to the
+    Python type of the column, like `"1"` to `1` for `Product.id`, because
+    SQLite matches the IN-list with the column affinity.
+
+    :param session_maker: An async session maker that use to load the rows.
+    :param column: A primary key or unique column attribute, like `Product.id`.
+    :param max_batch_size: A maximum number of keys per IN-list query.
+    :param cache: A flag that keep the loaded results on this loader. It should
+        use with the request-scope loader only.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        column: InstrumentedAttribute,
+        *,
+        max_batch_size: int = 500,
+        cache: bool = False,
+    ):
+        self.session_maker: async_sessionmaker = session_maker
+        self.column: InstrumentedAttribute = column
+        self.model: type[T] = column.class_
+        self.max_batch_size: int = max_batch_size
+        self.cache: bool = cache
+        self._pending: dict[Any, asyncio.Future] = {}
+        self._loaded: dict[Any, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+        try:
+            self._python_type: Optional[type] = column.type.python_type
+        except NotImplementedError:
+            self._python_type = None
+
+    def _coerce(self, key: Any) -> Any:
+        if (
+            key is None
+            or self._python_type is None
+            or isinstance(key, self._python_type)
+        ):
+            return key
+        try:
+            coerced: Any = self._python_type(key)
+        except (TypeError, ValueError) as err:
+            raise DatabaseManageException(
+                f"Key {key!r} does not match the type of {self.column}"
+            ) from err
+
+        # NOTE: Reject the lossy coercion, like `1.5` to `1`.
+        if isinstance(key, float) and coerced != key:
+            raise DatabaseManageException(
+                f"Key {key!r} does not match the type of {self.column}"
+            )
+        return coerced
+
+    async def load(self, key: Any) -> Optional[T]:
+        """Load the object of the key with the next batch query."""
+        key = self._coerce(key)
+        future: Optional[asyncio.Future] = (
+            self._loaded.get(key) or self._pending.get(key)
+        )
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            self._pending[key] = future
+            if self.cache:
+                self._loaded[key] = future
+
+        # NOTE: Shield the shared future, so the cancelled caller does not
+        #   cancel the result of the other callers of the same key.
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Any]) -> list[Optional[T]]:
+        """Load the objects of the keys with the same order of the keys."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def clear(self, key: Any = None):
+        """Clear the cached result of the key or all keys if it does not pass."""
+        if key is None:
+            self._loaded = {}
+        else:
+            self._loaded.pop(self._coerce(key), None)
+
+    def _dispatch(self):
+        pending, self._pending = self._pending, {}
+        keys: list[Any] = list(pending)
+        for i in range(0, len(keys), self.max_batch_size):
+            task = asyncio.create_task(
+                self._fetch(
+                    {k: pending[k] for k in keys[i:i + self.max_batch_size]}
+                )
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: dict[Any, asyncio.Future]):
+        try:
+            async with self.session_maker() as session:
+                result = await session.execute(
+                    select(self.model).where(self.column.in_(list(batch)))
+                )
+                found: dict[Any, T] = {
+                    getattr(obj, self.column.key): obj
+                    for obj in result.scalars().all()
+                }
+        except Exception as err:
+            for key, future in batch.items():
+                # NOTE: Do not cache the error, so the next load will retry.
+                self._loaded.pop(self._coerce(key), None)
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(key))
+
+
+class ModelLoaders:
+    """A bundle of the Batch Loaders for the point lookups of the models. It
+    should create one object per request scope.
+
+    :param session_maker: An async session maker that use to load the rows.
+    :param max_batch_size: A maximum number of keys per IN-list query.
+    :param cache: A flag that keep the loaded results on this request scope.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        *,
+        max_batch_size: int = 500,
+        cache: bool = False,
+    ):
+        kwargs: dict[str, Any] = {
+            "max_batch_size": max_batch_size,
+            "cache": cache,
+        }
+        self.product_by_id: BatchLoader[Product] = BatchLoader(
+            session_maker, Product.id, **kwargs
+        )
+        self.product_by_sku: BatchLoader[Product] = BatchLoader(
+            session_maker, Product.sku, **kwargs
+        )
+        self.user_by_id: BatchLoader[User] = BatchLoader(
+            session_maker, User.id, **kwargs
+        )
+        self.user_by_email: BatchLoader[User] = BatchLoader(
+            session_maker, User.email, **kwargs
+        )
+        self.role_by_name: BatchLoader[Role] = BatchLoader(
+            session_maker, Role.name, **kwargs
+        )
@@ -1,10 +1,71 @@
 from typing import Any
 
-from sqlalchemy import Integer, String, Float, select, func
+from sqlalchemy import (
+    DDL,
+    Integer,
+    String,
+    Float,
+    event,
+    func,
+    literal_column,
+    select,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import column, table
 
 from . import Base
 
+# NOTE: The FTS5 external-content table that keep the search index of the
+#   product name and description. It does not add to the metadata because
+#   the `create_all` method can not create the virtual table, so it creates
+#   with the DDL events of the products table below.
+PRODUCT_SEARCH_TABLE: str = "products_fts"
+products_fts = table(PRODUCT_SEARCH_TABLE, column("rowid"), column("rank"))
+
+# NOTE: Keep the FTS5 index sync with the products table by the triggers. The
+#   update trigger fire only when the name or description change, so the
+#   inventory update does not touch the index. All statements are idempotent,
+#   so it can run again on the existing database.
+PRODUCT_SEARCH_DDL: list[str] = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {PRODUCT_SEARCH_TABLE} USING fts5("
+    f"name, description, content='products', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {PRODUCT_SEARCH_TABLE}_insert "
+    f"AFTER INSERT ON products BEGIN "
+    f"INSERT INTO {PRODUCT_SEARCH_TABLE}(rowid, name, description) "
+    f"VALUES (new.id, new.name, new.description); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {PRODUCT_SEARCH_TABLE}_delete "
+    f"AFTER DELETE ON products BEGIN "
+    f"INSERT INTO {PRODUCT_SEARCH_TABLE}"
+    f"({PRODUCT_SEARCH_TABLE}, rowid, name, description) "
+    f"VALUES ('delete', old.id, old.name, old.description); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {PRODUCT_SEARCH_TABLE}_update "
+    f"AFTER UPDATE OF name, description ON products BEGIN "
+    f"INSERT INTO {PRODUCT_SEARCH_TABLE}"
+    f"({PRODUCT_SEARCH_TABLE}, rowid, name, description) "
+    f"VALUES ('delete', old.id, old.name, old.description); "
+    f"INSERT INTO {PRODUCT_SEARCH_TABLE}(rowid, name, description) "
+    f"VALUES (new.id, new.name, new.description); "
+    f"END",
+]
+
+_REBUILD_SEARCH_INDEX: str = (
+    f"INSERT INTO {PRODUCT_SEARCH_TABLE}({PRODUCT_SEARCH_TABLE}) "
+    f"VALUES ('rebuild')"
+)
+
+
+def quote_search_terms(query: str) -> str:
+    """Quote each whitespace-separated term of the user query as the FTS5
+    string, so the punctuation like `usb-c`, `2.0`, or `"red` match as the
+    plain text instead of raising the FTS5 syntax error.
+    """
+    return " ".join(
+        '"' + term.replace('"', '""') + '"' for term in query.split()
+    )
+
 
 class Product(Base):
     __tablename__ = "products"
@@ -92,3 +153,83 @@ class Product(Base):
                 select(func.sum(Product.price * Product.inventory))
             )
             return result.scalar() or 0.0
+
+    @classmethod
+    async def search_products(
+        cls,
+        session,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        raw: bool = False,
+    ) -> list["Product"]:
+        """Search products by name and description with the FTS5 index and
+        return the hits ordered by the BM25 rank. Each term of the query
+        match as the plain text and all terms should match.
+
+        :param raw: A flag that pass the query as the FTS5 query syntax, like
+            `phone OR red` or `"red phone"`, without quoting.
+        """
+        if not raw:
+            query = quote_search_terms(query)
+            if not query:
+                return []
+        async with session() as session:
+            result = await session.execute(
+                select(Product)
+                .join(products_fts, products_fts.c.rowid == Product.id)
+                .where(literal_column(PRODUCT_SEARCH_TABLE).match(query))
+                .order_by(products_fts.c.rank)
+                .limit(limit)
+                .offset(offset)
+            )
+            return result.scalars().all()
+
+    @classmethod
+    async def ensure_search_index(cls, session) -> None:
+        """Create the FTS5 index and its triggers if they do not exist, like on
+        the database that created before the index, and build the index from
+        the products table when it creates.
+        """
+        async with session() as session:
+            exists = (
+                await session.execute(
+                    text(
+                        "SELECT 1 FROM sqlite_master "
+                        "WHERE type = 'table' AND name = :name"
+                    ),
+                    {"name": PRODUCT_SEARCH_TABLE},
+                )
+            ).scalar()
+            for stmt in PRODUCT_SEARCH_DDL:
+                await session.execute(text(stmt))
+            if not exists:
+                await session.execute(text(_REBUILD_SEARCH_INDEX))
+            await session.commit()
+
+    @classmethod
+    async def rebuild_search_index(cls, session) -> None:
+        """Rebuild the FTS5 index from the products table. It creates the index
+        and its triggers first if they do not exist.
+        """
+        async with session() as session:
+            for stmt in PRODUCT_SEARCH_DDL:
+                await session.execute(text(stmt))
+            await session.execute(text(_REBUILD_SEARCH_INDEX))
+            await session.commit()
+
+
+for _ddl in PRODUCT_SEARCH_DDL:
+    event.listen(
+        Product.__table__,
+        "after_create",
+        DDL(_ddl).execute_if(dialect="sqlite"),
+    )
+
+event.listen(
+    Product.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {PRODUCT_SEARCH_TABLE}").execute_if(
+        dialect="sqlite"
+    ),
+)
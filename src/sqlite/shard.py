@@ -0,0 +1,154 @@
+import asyncio
+import zlib
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..exceptions import DatabaseManageException
+from .db import AsyncManage
+
+T = TypeVar("T")
+
+
+class ShardedAsyncManage:
+    """A Sharded Async Manage that spread rows of the same models across many
+    SQLite files by a shard key, like `User.email` or `Product.sku`. Each shard
+    is a normal `AsyncManage` object with its own file, so it has its own
+    writer lock and writes on different shards do not block each other.
+
+        Point lookups should route to a single shard with `shard_for`, and
+    scans or aggregates should fan out to all shards concurrently with
+    `fan_out` or `fan_out_session` and merge the partial results with the
+    `combine` function.
+
+    Warning:
+        The auto-increment primary keys are local to each shard, so the same
+    `id` value can exist on many shards. Use the shard key for the lookup.
+
+    :param num_shards: A number of SQLite files that use to keep the rows.
+    """
+
+    def __init__(self, num_shards: int):
+        if num_shards < 1:
+            raise DatabaseManageException(
+                f"Number of shards should more than 0, got {num_shards}"
+            )
+        self.num_shards: int = num_shards
+        self.shards: list[AsyncManage] = []
+
+    def init(self, url: str, echo: bool = False):
+        """Initialize all shard managers.
+
+        :param url: A SQLite URL template that contain `{shard}` placeholder,
+            like `sqlite+aiosqlite:///data/shard-{shard}.db`.
+        :param echo: A echo flag that pass to all shard engines.
+        """
+        if "{shard}" not in url:
+            raise DatabaseManageException(
+                "Sharded URL should contain the `{shard}` placeholder"
+            )
+        self.shards = []
+        for i in range(self.num_shards):
+            manage = AsyncManage()
+            manage.init(url.format(shard=i), echo=echo)
+            self.shards.append(manage)
+
+    async def initialize(self):
+        """Create all tables defined in the models on every shard"""
+        await asyncio.gather(*(shard.initialize() for shard in self.shards))
+
+    async def close(self):
+        """Close all connections on every shard"""
+        if not self.shards:
+            raise DatabaseManageException(
+                "ShardedAsyncManage is not initialized"
+            )
+        await asyncio.gather(*(shard.close() for shard in self.shards))
+        self.shards = []
+
+    def is_opened(self) -> bool:
+        return bool(self.shards) and all(s.is_opened() for s in self.shards)
+
+    def shard_index(self, key: Any) -> int:
+        """Return the shard index of the shard key value.
+
+        NOTE: It uses CRC32 of the string value instead of the builtin `hash`
+        because the builtin hash of `str` is randomized per process, so it can
+        not use for mapping rows to the files.
+        """
+        return zlib.crc32(str(key).encode("utf-8")) % self.num_shards
+
+    def shard_for(self, key: Any) -> AsyncManage:
+        """Return the shard manager that keep the row of the shard key value."""
+        if not self.shards:
+            raise DatabaseManageException(
+                "ShardedAsyncManage is not initialized"
+            )
+        return self.shards[self.shard_index(key)]
+
+    def session_maker_for(self, key: Any) -> async_sessionmaker:
+        """Return the session maker of the shard that keep the shard key value.
+        """
+        return self.shard_for(key).async_session_maker
+
+    async def fan_out(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args,
+        combine: Optional[Callable[[list[T]], Any]] = None,
+        **kwargs,
+    ) -> Any:
+        """Run the model method that receive a session maker, like
+        `Product.get_total_inventory_value`, on all shards concurrently and
+        merge the partial results.
+
+        :param func: A model method that receive a session maker.
+        :param combine: A function that merge the list of partial results in
+            the shard order, like `sum`. If it does not pass, it will return
+            this list.
+        """
+        if not self.shards:
+            raise DatabaseManageException(
+                "ShardedAsyncManage is not initialized"
+            )
+        partials: list[T] = list(
+            await asyncio.gather(
+                *(
+                    func(shard.async_session_maker, *args, **kwargs)
+                    for shard in self.shards
+                )
+            )
+        )
+        return partials if combine is None else combine(partials)
+
+    async def fan_out_session(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args,
+        combine: Optional[Callable[[list[T]], Any]] = None,
+        **kwargs,
+    ) -> Any:
+        """Run the model method that receive an async session, like
+        `User.count_users`, on all shards concurrently with an own session per
+        shard and merge the partial results.
+
+        :param func: A model method that receive an async session.
+        :param combine: A function that merge the list of partial results in
+            the shard order, like `sum`. If it does not pass, it will return
+            this list.
+        """
+        if not self.shards:
+            raise DatabaseManageException(
+                "ShardedAsyncManage is not initialized"
+            )
+
+        async def _run(manage: AsyncManage) -> T:
+            session: AsyncSession
+            async with manage.async_session_maker() as session:
+                return await func(session, *args, **kwargs)
+
+        partials: list[T] = list(
+            await asyncio.gather(*(_run(shard) for shard in self.shards))
+        )
+        return partials if combine is None else combine(partials)
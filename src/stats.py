@@ -0,0 +1,279 @@
+"""Cheap row counts and the planner statistics refresh.
+
+    The `RowCounter` supports three count modes:
+
+    - `exact`: Run `SELECT count(*)` every call.
+    - `cached`: Keep the exact count with the TTL. The commits that write to the
+      table invalidate its cached count, and the commits of the textual DML
+      invalidate the cached counts of all tables.
+    - `approximate`: Read the planner statistics, `sqlite_stat1` after ANALYZE
+      on SQLite or `pg_class.reltuples` on Postgres. It falls back to the exact
+      count if the table does not have the statistics yet.
+"""
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Literal, Optional, Union
+
+from sqlalchemy import Engine, event, func, select, text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+
+from .exceptions import DatabaseManageException
+
+logger = logging.getLogger(__name__)
+
+CountMode = Literal["exact", "cached", "approximate"]
+
+# NOTE: A connection info key that keep the written tables of the current
+#   transaction until it commits or rolls back.
+DIRTY_TABLES: str = "self_orm_dirty_tables"
+
+# NOTE: A dirty table marker of the textual DML, like `text("INSERT ...")` or
+#   `exec_driver_sql("DELETE ...")`, that does not know its table, so its
+#   commit invalidates the cached counts of all tables.
+ALL_TABLES: str = "*"
+TEXTUAL_DML: re.Pattern = re.compile(
+    r"^\s*(?:INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE
+)
+
+
+def analyze_statements(dialect_name: str) -> list[str]:
+    """Return the statements that refresh the planner statistics."""
+    if dialect_name == "sqlite":
+        return ["ANALYZE", "PRAGMA optimize"]
+    return ["ANALYZE"]
+
+
+async def refresh_statistics(conn: AsyncConnection) -> None:
+    """Refresh the planner statistics with the connection."""
+    for stmt in analyze_statements(conn.dialect.name):
+        await conn.exec_driver_sql(stmt)
+
+
+class RowCounter:
+    """A Row Counter that count the rows of the model with the exact, cached,
+    or approximate mode, and track the number of written rows since the last
+    statistics refresh.
+
+    :param ttl: A second TTL of the cached count.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl: float = ttl
+        self.writes: int = 0
+        self._cache: dict[str, tuple[int, float]] = {}
+
+        # NOTE: The invalidation generation per table and for all tables. The
+        #   cached count stores only if they do not change while it reads, so
+        #   the count that reads before the concurrent commit does not put the
+        #   stale value back to the cache.
+        self._generations: dict[str, int] = {}
+        self._generation: int = 0
+
+    def attach(self, engine: Union[AsyncEngine, Engine]):
+        """Start track the written tables on this engine."""
+        engine = getattr(engine, "sync_engine", engine)
+        event.listen(engine, "after_cursor_execute", self._track)
+        event.listen(engine, "commit", self._commit)
+        event.listen(engine, "rollback", self._rollback)
+
+    def invalidate(self, table: Optional[str] = None):
+        """Invalidate the cached count of the table or all tables if it does
+        not pass.
+        """
+        if table is None:
+            self._generation += 1
+            self._cache = {}
+        else:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            self._cache.pop(table, None)
+
+    def _current(self, table: str) -> tuple[int, int]:
+        return self._generation, self._generations.get(table, 0)
+
+    def _track(self, conn, cursor, statement, parameters, context, executemany):
+        if context.isinsert or context.isupdate or context.isdelete:
+            table = getattr(context.compiled.statement, "table", None)
+            name: str = ALL_TABLES if table is None else table.name
+        elif TEXTUAL_DML.match(statement):
+            name = ALL_TABLES
+        else:
+            return
+        dirty: dict[str, int] = conn.info.setdefault(DIRTY_TABLES, {})
+        dirty[name] = dirty.get(name, 0) + max(cursor.rowcount, 1)
+
+    def _commit(self, conn):
+        for table, rows in conn.info.pop(DIRTY_TABLES, {}).items():
+            self.invalidate(None if table == ALL_TABLES else table)
+            self.writes += rows
+
+    def _rollback(self, conn):
+        conn.info.pop(DIRTY_TABLES, None)
+
+    async def count(
+        self,
+        session: AsyncSession,
+        model: Any,
+        mode: CountMode = "exact",
+    ) -> int:
+        """Count the rows of the model with the count mode."""
+        table: str = model.__table__.name
+        if mode == "exact":
+            return await self._exact(session, model)
+        elif mode == "cached":
+            cached: Optional[tuple[int, float]] = self._cache.get(table)
+            if cached is not None and cached[1] > time.monotonic():
+                return cached[0]
+            generation: tuple[int, int] = self._current(table)
+            rs: int = await self._exact(session, model)
+            if self._current(table) == generation:
+                self._cache[table] = (rs, time.monotonic() + self.ttl)
+            return rs
+        elif mode == "approximate":
+            approx: Optional[int] = await self._approximate(session, model)
+            if approx is None:
+                return await self._exact(session, model)
+            return approx
+        raise DatabaseManageException(f"Count mode: {mode!r} does not support")
+
+    @staticmethod
+    async def _exact(session: AsyncSession, model: Any) -> int:
+        result = await session.execute(select(func.count()).select_from(model))
+        return result.scalar_one()
+
+    @staticmethod
+    async def _approximate(session: AsyncSession, model: Any) -> Optional[int]:
+        conn: AsyncConnection = await session.connection()
+        if conn.dialect.name == "sqlite":
+            exists = (
+                await conn.execute(
+                    text(
+                        "SELECT 1 FROM sqlite_master "
+                        "WHERE type = 'table' AND name = 'sqlite_stat1'"
+                    )
+                )
+            ).scalar()
+            if not exists:
+                return None
+
+            # NOTE: The first integer of the stat column is the number of rows
+            #   of the table or the index.
+            stats = (
+                await conn.execute(
+                    text("SELECT stat FROM sqlite_stat1 WHERE tbl = :tbl"),
+                    {"tbl": model.__table__.name},
+                )
+            ).scalars().all()
+            rows: list[int] = [int(s.split()[0]) for s in stats if s]
+            return max(rows) if rows else None
+        elif conn.dialect.name == "postgresql":
+            rs = (
+                await conn.execute(
+                    text(
+                        "SELECT reltuples FROM pg_class "
+                        "WHERE oid = to_regclass(:tbl)"
+                    ),
+                    {"tbl": model.__table__.fullname},
+                )
+            ).scalar()
+            # NOTE: The reltuples is -1 if the table never analyze or vacuum.
+            if rs is None or rs < 0:
+                return None
+            return int(rs)
+        return None
+
+
+class StatisticsMixin:
+    """A Statistics Mixin of the async manage that count the rows of the model
+    and run the statistics scheduler that refresh the planner statistics when
+    the written rows reach the threshold.
+
+        The manage should set the `engine` and `async_session_maker`, call
+    `init_statistics` on init, `start_statistics` on initialize, and
+    `stop_statistics` on close.
+    """
+
+    engine: Optional[AsyncEngine] = None
+    async_session_maker: Optional[async_sessionmaker] = None
+    row_counter: Optional[RowCounter] = None
+    analyze_threshold: Optional[int] = None
+    analyze_interval: float = 60.0
+    _analyze_task: Optional[asyncio.Task] = None
+
+    def init_statistics(
+        self,
+        count_ttl: float = 30.0,
+        analyze_threshold: Optional[int] = None,
+        analyze_interval: float = 60.0,
+    ):
+        """Attach the row counter to the engine.
+
+        :param count_ttl: A second TTL of the cached count.
+        :param analyze_threshold: A number of written rows that the scheduler
+            will refresh the statistics. It does not start the scheduler if it
+            does not pass.
+        :param analyze_interval: A second interval that the scheduler checks
+            the number of written rows.
+        """
+        # NOTE: The row counter track the written rows of this engine for
+        #   invalidate the cached counts and for the statistics scheduler that
+        #   will run ANALYZE when the written rows reach the threshold.
+        self.row_counter = RowCounter(ttl=count_ttl)
+        self.row_counter.attach(self.engine)
+        self.analyze_threshold = analyze_threshold
+        self.analyze_interval = analyze_interval
+
+    def start_statistics(self):
+        """Start the statistics scheduler if it has the threshold."""
+        if self.analyze_threshold and self._analyze_task is None:
+            self._analyze_task = asyncio.create_task(self._analyze_loop())
+
+    async def stop_statistics(self):
+        """Stop the statistics scheduler."""
+        try:
+            await self._cancel_task(self._analyze_task)
+        finally:
+            self._analyze_task = None
+
+    @staticmethod
+    async def _cancel_task(task: Optional[asyncio.Task]):
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def count(self, model: Any, mode: CountMode = "exact") -> int:
+        """Count the rows of the model with the exact, cached, or approximate
+        mode.
+        """
+        async with self.async_session_maker() as session:
+            return await self.row_counter.count(session, model, mode)
+
+    async def analyze(self):
+        """Refresh the planner statistics with the statements of the dialect,
+        like ANALYZE and `PRAGMA optimize` on SQLite.
+        """
+        async with self.engine.begin() as conn:
+            await refresh_statistics(conn)
+        self.row_counter.writes = 0
+
+    async def _analyze_loop(self):
+        while True:
+            await asyncio.sleep(self.analyze_interval)
+            if self.row_counter.writes < self.analyze_threshold:
+                continue
+            # NOTE: Keep the scheduler alive and retry on the next interval if
+            #   the refresh fails.
+            try:
+                await self.analyze()
+            except Exception:
+                logger.exception("Background statistics refresh failed")
@@ -3,6 +3,27 @@ from pathlib import Path
 import pytest
 
 
+def pytest_configure(config: pytest.Config):
+    config.addinivalue_line(
+        "markers",
+        "db_clone(template, file, **kwargs): change the `db_clone` fixture of "
+        "the SQLite tests.",
+    )
+
+
+def pytest_addoption(parser: pytest.Parser):
+    parser.addoption(
+        "--query-plan",
+        action="store_true",
+        default=False,
+        help=(
+            "Capture the query plans of the session database, write the "
+            "report to `tests/query-plan.<worker>.txt`, and fail on the new "
+            "full scan or missing foreign key index."
+        ),
+    )
+
+
 @pytest.fixture(scope='session')
 def test_path() -> Path:
     return Path(__file__).parent
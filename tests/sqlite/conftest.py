@@ -1,31 +1,198 @@
 import os
+import shutil
+import uuid
 from collections.abc import AsyncGenerator
 from pathlib import Path
+from typing import Any
 
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, create_async_engine
+)
+from src.diagnostics import PlanIssue, QueryPlanCollector, format_report
 from src.sqlite.db import AsyncManage
+from src.sqlite.shard import ShardedAsyncManage
 
 from ..conftest import test_path
 
+# NOTE: The known issues that the `--query-plan` check does not fail on. The
+#   key is the kind, the table, and the detail of the issue.
+QUERY_PLAN_BASELINE: set[tuple[str, str, str]] = {
+    (
+        "missing_fk_index",
+        "associate_roles_policies",
+        "Foreign key associate_roles_policies(policy_id) does not have an "
+        "index",
+    ),
+    # NOTE: The selectin load of `Policy.roles` scans the secondary table by
+    #   the same foreign key that does not have an index.
+    (
+        "full_scan",
+        "associate_roles_policies",
+        "SCAN associate_roles_policies_1",
+    ),
+}
+QUERY_PLAN_FAIL_KINDS: tuple[str, ...] = ("full_scan", "missing_fk_index")
 
+
+# NOTE: The `worker_id` fixture comes from pytest-xdist, and it is `master` if
+#   the tests do not run on the workers.
 @pytest.fixture(scope="session")
-def db_file(test_path) -> Path:
-    return test_path / 'sqlite.async.db'
+def db_file(test_path, worker_id) -> Path:
+    return test_path / f'sqlite.async.{worker_id}.db'
+
+
+@pytest.fixture(scope="session")
+def db_template(tmp_path_factory) -> Path:
+    """Create the template database file that already has all tables. Each
+    worker clones it to its own in-memory database, so the schema creates only
+    once per worker. Override this fixture to pre-seed the template rows.
+    """
+    from src.sqlite.models import Base
+
+    template: Path = tmp_path_factory.mktemp("template") / "template.db"
+    engine = create_engine(f"sqlite:///{template}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return template
+
+
+@pytest.fixture(scope="session")
+def db_template_seeded(tmp_path_factory, db_template) -> Path:
+    """Create the template database with the seed rows, 10000 products, 10
+    users, and the `admin` and `anon` roles, for the `db_clone` fixture of the
+    test that mark with `@pytest.mark.db_clone(template="db_template_seeded")`.
+    """
+    from src.sqlite.models import Product, Role, User
+
+    template: Path = tmp_path_factory.mktemp("template") / "seeded.db"
+    shutil.copyfile(db_template, template)
+    engine = create_engine(f"sqlite:///{template}")
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Product),
+            [
+                {
+                    "name": f"Product {i}",
+                    "price": float(i % 10),
+                    "sku": f"SKU-{i}",
+                    "description": "",
+                    "inventory": i,
+                }
+                for i in range(1, 10001)
+            ],
+        )
+        conn.execute(
+            insert(User),
+            [
+                {"name": f"User {i}", "email": f"user{i}@example.com"}
+                for i in range(1, 11)
+            ],
+        )
+        conn.execute(insert(Role), [{"name": "admin"}, {"name": "anon"}])
+    engine.dispose()
+    return template
 
 
 @pytest.fixture(scope='session', autouse=True)
-def db_manage(db_file) -> AsyncManage:
+def db_manage(db_file, db_template, worker_id) -> AsyncManage:
     print("Start setup SQLite database")
     manage = AsyncManage()
-    manage.init(f"sqlite+aiosqlite:///{db_file}")
+    # NOTE: Run the whole session in memory and write the file only at close.
+    manage.init_memory(
+        name=f"sqlite-async-test-{worker_id}",
+        load_from=str(db_template),
+        snapshot_to=str(db_file),
+    )
     return manage
 
 
+@pytest.fixture(scope='session')
+async def db_savepoint_engine(db_manage) -> AsyncGenerator[AsyncEngine]:
+    """An engine on the same in-memory database that can use SAVEPOINT.
+
+        The sqlite3 driver does not emit BEGIN by itself and it commits before
+    the SAVEPOINT statement, so this engine disables its transaction handling
+    and emits BEGIN on the SQLAlchemy begin event.
+    """
+    engine = create_async_engine(
+        db_manage.engine.url, connect_args={"check_same_thread": False}
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    yield engine
+
+    await engine.dispose()
+
+
 @pytest.fixture(scope='function')
-async def db_session(db_manage) -> AsyncGenerator[AsyncSession]:
+async def db_session(db_savepoint_engine) -> AsyncGenerator[AsyncSession]:
+    """An isolated session that wrap the test with the outer transaction. All
+    commits of this session become the SAVEPOINT release, and all changes roll
+    back at the end of the test.
+    """
     print("Start setup SQLite session")
-    async with db_manage.async_session_maker() as session:
+    async with db_savepoint_engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await trans.rollback()
+
+
+@pytest.fixture(scope='function')
+async def db_clone(request, tmp_path) -> AsyncGenerator[AsyncManage]:
+    """An isolated manage on the fresh in-memory clone of the template database
+    for the test that need the real commits on many connections.
+
+        The `db_clone` marker on the test or the module changes this clone. The
+    `template` key is the name of the template fixture, the `file` key clones
+    the template to the file on the `tmp_path` instead of memory, like for the
+    process-pool read mode, and the other keys pass to the init method.
+
+    >>> @pytest.mark.db_clone(template="db_template_seeded", read_workers=2)
+    """
+    marker = request.node.get_closest_marker("db_clone")
+    options: dict[str, Any] = dict(marker.kwargs) if marker else {}
+    template: Path = request.getfixturevalue(
+        options.pop("template", "db_template")
+    )
+
+    manage = AsyncManage()
+    if options.pop("file", False):
+        clone: Path = tmp_path / "clone.db"
+        shutil.copyfile(template, clone)
+        manage.init(f"sqlite+aiosqlite:///{clone}", **options)
+    else:
+        manage.init_memory(
+            name=f"sqlite-async-clone-{uuid.uuid4().hex}",
+            load_from=str(template),
+            **options,
+        )
+    await manage.initialize()
+
+    yield manage
+
+    await manage.close()
+
+
+@pytest.fixture(scope='function')
+async def db_clone_session(db_clone) -> AsyncGenerator[AsyncSession]:
+    async with db_clone.async_session_maker() as session:
         try:
             yield session
             await session.commit()
@@ -36,18 +203,71 @@ async def db_session(db_manage) -> AsyncGenerator[AsyncSession]:
             await session.close()
 
 
+@pytest.fixture(scope='function')
+async def db_shards(request, tmp_path) -> AsyncGenerator[ShardedAsyncManage]:
+    """A sharded manage on the fresh files of the `tmp_path`. The indirect
+    parameter is the number of shards, and it is 4 by default.
+    """
+    manage = ShardedAsyncManage(num_shards=getattr(request, "param", 4))
+    manage.init(f"sqlite+aiosqlite:///{tmp_path}/shard-{{shard}}.db")
+    await manage.initialize()
+
+    yield manage
+
+    await manage.close()
+
+
 @pytest.fixture(scope='session', autouse=True)
 async def initial_objects(db_manage, db_file) -> None:
     await db_manage.initialize()
 
     yield
 
-    from src.sqlite.models import Base
-
-    async with db_manage.engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
     await db_manage.close()
 
     if os.path.exists(db_file):
         os.remove(db_file)
+
+
+@pytest.fixture(scope='session', autouse=True)
+async def db_query_plan(
+    request,
+    initial_objects,
+    db_manage,
+    db_savepoint_engine,
+    test_path,
+    worker_id,
+) -> None:
+    """Capture the query plans of all statements that run on the session
+    database when pytest runs with the `--query-plan` option, then write the
+    report and fail on the new issues that do not in the baseline.
+    """
+    if not request.config.getoption("--query-plan"):
+        yield
+        return
+
+    from src.sqlite.models import Base
+
+    collector = QueryPlanCollector(Base.metadata)
+    collector.attach(db_manage.engine)
+    collector.attach(db_savepoint_engine)
+
+    yield
+
+    collector.detach()
+    issues: list[PlanIssue] = await collector.analyze(db_manage.engine)
+
+    report: Path = test_path / f"query-plan.{worker_id}.txt"
+    report.write_text(format_report(issues))
+
+    new_issues: list[PlanIssue] = [
+        issue
+        for issue in issues
+        if issue.kind in QUERY_PLAN_FAIL_KINDS
+        and (issue.kind, issue.table, issue.detail) not in QUERY_PLAN_BASELINE
+    ]
+    if new_issues:
+        pytest.fail(
+            f"Query plan check found {len(new_issues)} new issue(s), see the "
+            f"report at {report}:\n{format_report(new_issues)}"
+        )
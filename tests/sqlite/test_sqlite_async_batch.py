@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, Table, insert, select, update
+)
+
+from src.sqlite.db import AsyncManage
+from src.sqlite.models import Product
+
+pytestmark = pytest.mark.db_clone(template="db_template_seeded")
+
+
+@pytest.mark.asyncio
+async def test_sqlite_execute_batch(db_clone: AsyncManage):
+    rs = await db_clone.execute_batch(
+        [
+            select(Product.sku).where(Product.id == 1),
+            select(Product.id).where(Product.sku.in_(["SKU-2", "SKU-3"])),
+            update(Product).where(Product.id <= 10).values(inventory=0),
+            ("SELECT count(*) FROM products WHERE inventory = ?", (0,)),
+            "SELECT 1",
+        ]
+    )
+    assert rs == [[("SKU-1",)], [(2,), (3,)], 10, [(10,)], [(1,)]]
+
+    # NOTE: The batch commit the update statement.
+    async with db_clone.async_session_maker() as session:
+        product = await session.get(Product, 1)
+        assert product.inventory == 0
+
+
+@pytest.mark.asyncio
+async def test_sqlite_execute_batch_bind_processor(db_clone: AsyncManage):
+    events = Table(
+        "events",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("at", DateTime),
+    )
+    async with db_clone.engine.begin() as conn:
+        await conn.run_sync(events.metadata.create_all)
+        await conn.execute(insert(events).values(at=datetime(2024, 1, 1, 12)))
+
+    rs = await db_clone.execute_batch(
+        [
+            insert(events).values(at=datetime(2024, 1, 2, 12)),
+            select(events.c.id).where(
+                events.c.at.in_(
+                    [datetime(2024, 1, 1, 12), datetime(2024, 1, 2, 12)]
+                )
+            ),
+            select(events.c.at).where(events.c.id == 2),
+        ]
+    )
+
+    # NOTE: The batch writes and matches the same stored value as the engine,
+    #   but it returns the raw string without the result processing.
+    assert rs == [1, [(1,), (2,)], [("2024-01-02 12:00:00.000000",)]]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_execute_pipeline(db_clone: AsyncManage):
+    def move_inventory(execute) -> int:
+        rows = execute(
+            select(Product.id, Product.inventory).where(Product.sku == "SKU-5")
+        )
+        product_id, inventory = rows[0]
+        execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(inventory=0)
+        )
+        execute(
+            update(Product)
+            .where(Product.sku == "SKU-6")
+            .values(inventory=Product.inventory + inventory)
+        )
+        return inventory
+
+    assert await db_clone.execute_pipeline(move_inventory) == 5
+
+    rs = await db_clone.execute_batch(
+        [select(Product.inventory).where(Product.id.in_([5, 6]))]
+    )
+    assert rs == [[(0,), (11,)]]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_execute_pipeline_rollback(db_clone: AsyncManage):
+    def failed(execute):
+        execute(update(Product).values(inventory=0))
+        raise ValueError("Rollback the pipeline")
+
+    with pytest.raises(ValueError):
+        await db_clone.execute_pipeline(failed)
+
+    rs = await db_clone.execute_batch(
+        ["SELECT count(*) FROM products WHERE inventory = 0"]
+    )
+    assert rs == [[(0,)]]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_execute_pipeline_concurrent_write(
+    db_clone: AsyncManage,
+):
+    selected = threading.Event()
+
+    def add_inventory(execute) -> None:
+        rows = execute(select(Product.inventory).where(Product.id == 1))
+        selected.set()
+        # NOTE: Give the concurrent writer the time to try its update between
+        #   the SELECT and the UPDATE statements of this pipeline.
+        time.sleep(0.2)
+        execute(
+            update(Product)
+            .where(Product.id == 1)
+            .values(inventory=rows[0][0] + 10)
+        )
+
+    async def concurrent_write() -> None:
+        await asyncio.to_thread(selected.wait)
+        async with db_clone.engine.begin() as conn:
+            await conn.execute(
+                update(Product)
+                .where(Product.id == 1)
+                .values(inventory=Product.inventory + 100)
+            )
+
+    await asyncio.gather(
+        db_clone.execute_pipeline(add_inventory, write=True),
+        concurrent_write(),
+    )
+
+    # NOTE: Both writes apply, so the concurrent writer does not interleave
+    #   with the pipeline and lose the update.
+    rs = await db_clone.execute_batch(
+        [select(Product.inventory).where(Product.id == 1)]
+    )
+    assert rs == [[(111,)]]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_execute_batch_benchmark(db_clone: AsyncManage):
+    statements = [
+        select(Product.id, Product.sku).where(Product.id == i % 100 + 1)
+        for i in range(1000)
+    ]
+
+    start_time = time.time()
+    async with db_clone.engine.connect() as conn:
+        for stmt in statements:
+            (await conn.execute(stmt)).all()
+    single_time = time.time() - start_time
+
+    start_time = time.time()
+    rs = await db_clone.execute_batch(statements)
+    batch_time = time.time() - start_time
+
+    assert len(rs) == 1000
+    print(
+        f"Per statement: single {single_time / len(statements) * 1e6:.1f} us, "
+        f"batch {batch_time / len(statements) * 1e6:.1f} us"
+    )
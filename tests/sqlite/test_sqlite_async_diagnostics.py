@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import insert, select
+
+from src.diagnostics import QueryPlanCollector, format_report
+from src.sqlite.db import AsyncManage
+from src.sqlite.models import Base, Policy, Product, Role, RolePolicy, User
+
+
+@pytest.mark.asyncio
+async def test_sqlite_query_plan_collector(db_clone: AsyncManage):
+    collector = QueryPlanCollector(Base.metadata)
+    collector.attach(db_clone.engine)
+
+    session = db_clone.async_session_maker
+    await Product.get_product_by_sku(session, "SKU-1")
+    await Product.get_product_by_id(session, 1)
+    await Product.get_all_products(session)
+    async with session() as s:
+        await User.read_users(s)
+        await s.execute(
+            select(Product).where(Product.description == "A phone")
+        )
+        await s.execute(select(Product).order_by(Product.price))
+        await s.execute(select(Role).where(Role.name == "admin"))
+
+    collector.detach()
+    issues = await collector.analyze(db_clone.engine)
+    report: str = format_report(issues)
+    print(report)
+
+    scans = [i for i in issues if i.kind == "full_scan"]
+    assert [i.table for i in scans] == ["products"]
+    assert scans[0].suggestion == (
+        'Index("ix_products_description", products.c.description)'
+    )
+    assert scans[0].ddl == (
+        "CREATE INDEX ix_products_description ON products (description)"
+    )
+
+    sorts = [i for i in issues if i.kind == "temp_btree"]
+    assert len(sorts) == 1
+    assert sorts[0].suggestion == (
+        'Index("ix_products_price", products.c.price)'
+    )
+
+    fks = [i for i in issues if i.kind == "missing_fk_index"]
+    assert [(i.table, i.suggestion) for i in fks] == [
+        (
+            "associate_roles_policies",
+            'Index("ix_associate_roles_policies_policy_id", '
+            'associate_roles_policies.c.policy_id)',
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_query_plan_collector_alias(db_clone: AsyncManage):
+    async with db_clone.engine.begin() as conn:
+        await conn.execute(insert(Role), [{"name": "admin"}])
+        await conn.execute(
+            insert(Policy), [{"resource": "logs", "action": "read"}]
+        )
+        await conn.execute(
+            insert(RolePolicy), [{"role_id": 1, "policy_id": 1}]
+        )
+
+    collector = QueryPlanCollector(Base.metadata)
+    collector.attach(db_clone.engine)
+    async with db_clone.async_session_maker() as s:
+        # NOTE: The selectin load of `Policy.roles` joins the anonymous alias
+        #   of the secondary table.
+        policies = (await s.execute(select(Policy))).scalars().all()
+        assert [r.name for r in policies[0].roles] == ["admin"]
+
+        p = Product.__table__.alias("p")
+        await s.execute(select(p).where(p.c.description == "A phone"))
+    collector.detach()
+
+    issues = await collector.analyze(db_clone.engine)
+    scans = {
+        i.detail: i.suggestion for i in issues if i.kind == "full_scan"
+    }
+    assert scans == {
+        "SCAN associate_roles_policies_1": (
+            'Index("ix_associate_roles_policies_policy_id", '
+            'associate_roles_policies.c.policy_id)'
+        ),
+        "SCAN p": 'Index("ix_products_description", products.c.description)',
+    }
+
+
+@pytest.mark.asyncio
+async def test_sqlite_query_plan_collector_detach(db_clone: AsyncManage):
+    collector = QueryPlanCollector(Base.metadata)
+    collector.attach(db_clone.engine)
+    await Product.get_product_by_sku(db_clone.async_session_maker, "SKU-1")
+    collector.detach()
+    await Product.get_all_products(db_clone.async_session_maker)
+
+    assert len(collector.statements) == 1
+    collector.clear()
+    assert collector.statements == {}
@@ -0,0 +1,127 @@
+import hashlib
+import time
+
+import pytest
+from sqlalchemy import func, select
+
+from src.exceptions import DatabaseManageException
+from src.sqlite.db import AsyncManage
+from src.sqlite.executor import split_range
+from src.sqlite.models import Product
+
+pytestmark = pytest.mark.db_clone(
+    template="db_template_seeded", file=True, read_workers=2
+)
+
+
+def inventory_value(rows: list[tuple]) -> float:
+    return sum(price * inventory for price, inventory in rows)
+
+
+def heavy_checksum(rows: list[tuple]) -> int:
+    """A CPU-heavy processor that hash each row many times."""
+    total: int = 0
+    for row in rows:
+        digest: bytes = repr(row).encode()
+        for _ in range(50):
+            digest = hashlib.sha256(digest).digest()
+        total += digest[0]
+    return total
+
+
+def test_sqlite_split_range():
+    assert split_range(1, 10, 3) == [(1, 5), (5, 8), (8, 11)]
+    assert split_range(1, 2, 4) == [(1, 2), (2, 3)]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_read_partitioned_rows(db_clone: AsyncManage):
+    rows = await db_clone.read_partitioned(
+        select(Product.id, Product.sku), Product.id, partitions=4
+    )
+    assert len(rows) == 10000
+    assert sorted(r[0] for r in rows) == list(range(1, 10001))
+
+
+@pytest.mark.asyncio
+async def test_sqlite_read_partitioned_aggregate(db_clone: AsyncManage):
+    start_time = time.time()
+    value = await db_clone.read_partitioned(
+        select(Product.price, Product.inventory),
+        Product.id,
+        processor=inventory_value,
+        combine=sum,
+    )
+    execution_time = time.time() - start_time
+
+    assert value == await Product.get_total_inventory_value(
+        db_clone.async_session_maker
+    )
+    print(f"Executed partitioned aggregate in {execution_time:.2f} seconds")
+
+
+@pytest.mark.asyncio
+async def test_sqlite_read_partitioned_aggregate_sql(db_clone: AsyncManage):
+    with pytest.raises(DatabaseManageException):
+        await db_clone.read_partitioned(
+            select(func.count()).select_from(Product), Product.id
+        )
+
+    count = await db_clone.read_partitioned(
+        select(func.count()).select_from(Product),
+        Product.id,
+        partitions=4,
+        combine=lambda partials: sum(rows[0][0] for rows in partials),
+    )
+    assert count == 10000
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "stmt",
+    [
+        select(Product.id).order_by(Product.price).limit(10),
+        select(Product.id).offset(10),
+        select(Product.id).order_by(Product.price),
+        select(Product.price).distinct(),
+        select(Product.price).group_by(Product.price),
+    ],
+)
+async def test_sqlite_read_partitioned_unsupported(
+    db_clone: AsyncManage, stmt
+):
+    with pytest.raises(DatabaseManageException):
+        await db_clone.read_partitioned(stmt, Product.id)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_read_partitioned_benchmark(db_clone: AsyncManage):
+    stmt = select(Product.id, Product.sku, Product.price)
+
+    start_time = time.time()
+    async with db_clone.engine.connect() as conn:
+        direct = heavy_checksum([tuple(r) for r in await conn.execute(stmt)])
+    direct_time = time.time() - start_time
+
+    # NOTE: Warm up the worker processes before the timing.
+    await db_clone.read_partitioned(
+        select(Product.id).where(Product.id == 1), Product.id
+    )
+
+    start_time = time.time()
+    partitioned = await db_clone.read_partitioned(
+        stmt, Product.id, processor=heavy_checksum, combine=sum
+    )
+    partitioned_time = time.time() - start_time
+
+    assert partitioned == direct
+    print(
+        f"Process 10000 products: direct {direct_time:.2f} seconds, "
+        f"partitioned {partitioned_time:.2f} seconds"
+    )
+
+
+@pytest.mark.asyncio
+async def test_sqlite_read_partitioned_disable(db_manage: AsyncManage):
+    with pytest.raises(DatabaseManageException):
+        await db_manage.read_partitioned(select(Product.id), Product.id)
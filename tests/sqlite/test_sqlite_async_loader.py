@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import event
+
+from src.exceptions import DatabaseManageException
+from src.sqlite.db import AsyncManage
+from src.sqlite.loader import BatchLoader, ModelLoaders
+from src.sqlite.models import Product
+
+pytestmark = pytest.mark.db_clone(template="db_template_seeded")
+
+
+def count_selects(manage: AsyncManage) -> list[str]:
+    statements: list[str] = []
+
+    @event.listens_for(manage.engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            statements.append(statement)
+
+    return statements
+
+
+@pytest.mark.asyncio
+async def test_sqlite_batch_loader(db_clone: AsyncManage):
+    statements = count_selects(db_clone)
+    loaders = ModelLoaders(db_clone.async_session_maker)
+
+    products = await asyncio.gather(
+        loaders.product_by_id.load(1),
+        loaders.product_by_id.load(2),
+        loaders.product_by_id.load(1),
+        loaders.product_by_id.load(99999),
+    )
+    assert [p.id if p else None for p in products] == [1, 2, 1, None]
+    assert products[0] is products[2]
+    assert len(statements) == 1
+
+    users = await loaders.user_by_email.load_many(
+        ["user3@example.com", "missing@example.com", "user1@example.com"]
+    )
+    assert [u.id if u else None for u in users] == [3, None, 1]
+
+    assert (await loaders.product_by_sku.load("SKU-5")).inventory == 5
+    assert (await loaders.user_by_id.load(2)).email == "user2@example.com"
+    assert (await loaders.role_by_name.load("admin")).name == "admin"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_batch_loader_coerce_key(db_clone: AsyncManage):
+    statements = count_selects(db_clone)
+    loader = BatchLoader(db_clone.async_session_maker, Product.id)
+
+    products = await loader.load_many([1, "1", 2.0])
+    assert [p.id for p in products] == [1, 1, 2]
+    assert len(statements) == 1
+
+    sku_loader = BatchLoader(db_clone.async_session_maker, Product.sku)
+    assert await sku_loader.load("SKU-1") is not None
+
+    for key in ("abc", 1.5):
+        with pytest.raises(DatabaseManageException):
+            await loader.load(key)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_batch_loader_chunk(db_clone: AsyncManage):
+    statements = count_selects(db_clone)
+    loader = BatchLoader(
+        db_clone.async_session_maker, Product.id, max_batch_size=30
+    )
+
+    products = await loader.load_many(range(1, 101))
+    assert [p.id for p in products] == list(range(1, 101))
+    assert len(statements) == 4
+
+
+@pytest.mark.asyncio
+async def test_sqlite_batch_loader_cache(db_clone: AsyncManage):
+    statements = count_selects(db_clone)
+    loader = BatchLoader(
+        db_clone.async_session_maker, Product.id, cache=True
+    )
+
+    first = await loader.load(1)
+    assert await loader.load(1) is first
+    assert len(statements) == 1
+
+    loader.clear(1)
+    await loader.load(1)
+    assert len(statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_sqlite_batch_loader_concurrent_read(db_clone: AsyncManage):
+    session = db_clone.async_session_maker
+
+    start_time = time.time()
+    await asyncio.gather(
+        *(Product.get_product_by_id(session, i % 100 + 1) for i in range(2000))
+    )
+    direct_time = time.time() - start_time
+
+    loader = BatchLoader(session, Product.id)
+    start_time = time.time()
+    products = await asyncio.gather(
+        *(loader.load(i % 100 + 1) for i in range(2000))
+    )
+    batch_time = time.time() - start_time
+
+    assert [p.id for p in products] == [i % 100 + 1 for i in range(2000)]
+    print(
+        f"Read 2000 products: direct {direct_time:.2f} seconds, "
+        f"batch {batch_time:.4f} seconds"
+    )
@@ -0,0 +1,132 @@
+import asyncio
+import sqlite3
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.exceptions import DatabaseManageException
+from src.sqlite.db import AsyncManage
+from src.sqlite.models import User
+
+
+async def add_user(manage: AsyncManage, i: int) -> None:
+    session: AsyncSession
+    async with manage.async_session_maker() as session:
+        session.add(User(name=f"User {i}", email=f"memory{i}@example.com"))
+        await session.commit()
+
+
+def count_file_users(path) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT count(*) FROM users").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_memory_shared_between_connections():
+    manage = AsyncManage()
+    manage.init_memory(name="memory-shared")
+    await manage.initialize()
+
+    await asyncio.gather(*(add_user(manage, i) for i in range(50)))
+
+    async with manage.async_session_maker() as session:
+        assert await User.count_users(session) == 50
+
+    await manage.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_memory_snapshot_on_close_and_load(tmp_path):
+    snapshot_file = tmp_path / "memory.db"
+
+    manage = AsyncManage()
+    manage.init_memory(name="memory-snapshot", snapshot_to=str(snapshot_file))
+    await manage.initialize()
+    await asyncio.gather(*(add_user(manage, i) for i in range(10)))
+
+    # NOTE: Nothing go to the disk before close.
+    assert not snapshot_file.exists()
+
+    await manage.close()
+    assert count_file_users(snapshot_file) == 10
+
+    manage = AsyncManage()
+    manage.init_memory(name="memory-load", load_from=str(snapshot_file))
+    await manage.initialize()
+    async with manage.async_session_maker() as session:
+        assert await User.count_users(session) == 10
+    await manage.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_memory_snapshot_interval(tmp_path):
+    snapshot_file = tmp_path / "memory.db"
+
+    manage = AsyncManage()
+    manage.init_memory(
+        name="memory-interval",
+        snapshot_to=str(snapshot_file),
+        snapshot_interval=0.05,
+    )
+    await manage.initialize()
+    await add_user(manage, 1)
+    await asyncio.sleep(0.2)
+
+    assert count_file_users(snapshot_file) == 1
+    await manage.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_memory_snapshot_disable(tmp_path):
+    manage = AsyncManage()
+    manage.init(f"sqlite+aiosqlite:///{tmp_path / 'file.db'}")
+    with pytest.raises(DatabaseManageException):
+        await manage.snapshot(str(tmp_path / "snapshot.db"))
+    await manage.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_memory_snapshot_interval_retry(tmp_path, caplog):
+    # NOTE: The parent directory does not exist, so the snapshot path is not
+    #   writable until the test creates it.
+    snapshot_file = tmp_path / "missing" / "memory.db"
+
+    manage = AsyncManage()
+    manage.init_memory(
+        name="memory-retry",
+        snapshot_to=str(snapshot_file),
+        snapshot_interval=0.05,
+    )
+    await manage.initialize()
+    await add_user(manage, 1)
+    await asyncio.sleep(0.15)
+
+    assert "Background snapshot" in caplog.text
+    assert not manage._snapshot_task.done()
+
+    snapshot_file.parent.mkdir()
+    await asyncio.sleep(0.15)
+    assert count_file_users(snapshot_file) == 1
+    await manage.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_memory_close_after_snapshot_fail(tmp_path):
+    manage = AsyncManage()
+    manage.init_memory(
+        name="memory-close-fail",
+        snapshot_to=str(tmp_path / "missing" / "memory.db"),
+    )
+    await manage.initialize()
+    await add_user(manage, 1)
+
+    with pytest.raises(sqlite3.OperationalError):
+        await manage.close()
+
+    # NOTE: All resources close even if the final snapshot fails.
+    assert manage.engine is None
+    assert manage.memory_anchor is None
+    assert not manage.is_opened()
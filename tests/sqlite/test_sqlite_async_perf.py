@@ -30,13 +30,27 @@ async def add_users(
             await session.close()
 
 
+async def read_users(db_manage: AsyncManage) -> list[User]:
+    """Read all users with an own session, because an AsyncSession does not
+    support the concurrent tasks.
+    """
+    async with db_manage.async_session_maker() as session:
+        return await User.read_users(session)
+
+
+async def count_users(db_manage: AsyncManage) -> int:
+    """Count all users with an own session."""
+    async with db_manage.async_session_maker() as session:
+        return await User.count_users(session)
+
+
 @pytest.mark.asyncio
 async def test_sqlite_concurrent_read_write(
-    db_session: AsyncSession, db_manage: AsyncManage
+    db_clone_session: AsyncSession, db_clone: AsyncManage
 ):
-    await add_users(db_manage, 1, 10)
+    await add_users(db_clone, 1, 10)
 
-    initial_count = await User.count_users(db_session)
+    initial_count = await User.count_users(db_clone_session)
     assert initial_count == 10
 
     write_tasks = []
@@ -45,13 +59,13 @@ async def test_sqlite_concurrent_read_write(
     # Create 10 write tasks (each adding 5 users)
     for i in range(10):
         write_tasks.append(
-            asyncio.create_task(add_users(db_manage, (i + 1) * 100, 5))
+            asyncio.create_task(add_users(db_clone, (i + 1) * 100, 5))
         )
 
     # Create 20 read tasks
     for _ in range(20):
-        read_tasks.append(asyncio.create_task(User.read_users(db_session)))
-        read_tasks.append(asyncio.create_task(User.count_users(db_session)))
+        read_tasks.append(asyncio.create_task(read_users(db_clone)))
+        read_tasks.append(asyncio.create_task(count_users(db_clone)))
 
     # Execute all tasks concurrently
     all_tasks = write_tasks + read_tasks
@@ -62,13 +76,13 @@ async def test_sqlite_concurrent_read_write(
     assert len(exceptions) == 0, f"Exceptions occurred: {exceptions}"
 
     # Verify final count (initial 10 + 10 writes of 5 users each = 60)
-    final_count = await User.count_users(db_session)
+    final_count = await User.count_users(db_clone_session)
     assert final_count == 60, f"Expected 60 users, got {final_count}"
 
 
 @pytest.mark.asyncio
 async def test_sqlite_intensive_concurrent_operations(
-    db_session: AsyncSession, db_manage: AsyncManage
+    db_clone_session: AsyncSession, db_clone: AsyncManage
 ):
     """Test more intensive concurrent read/write operations with timing."""
     start_time = time.time()
@@ -76,14 +90,14 @@ async def test_sqlite_intensive_concurrent_operations(
 
     for i in range(50):
         tasks.append(
-            asyncio.create_task(add_users(db_manage, i * 1000, 10))
+            asyncio.create_task(add_users(db_clone, i * 1000, 10))
         )
 
     # Readers (100 tasks)
     for _ in range(50):
         # Mix of different read operations
-        tasks.append(asyncio.create_task(User.count_users(db_session)))
-        tasks.append(asyncio.create_task(User.read_users(db_session)))
+        tasks.append(asyncio.create_task(count_users(db_clone)))
+        tasks.append(asyncio.create_task(read_users(db_clone)))
 
     # Execute all tasks concurrently
     results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -93,7 +107,7 @@ async def test_sqlite_intensive_concurrent_operations(
     assert len(exceptions) == 0, f"Exceptions occurred: {exceptions}"
 
     # Verify final user count (50 writers * 10 users = 500)
-    final_count = await User.count_users(db_session)
+    final_count = await User.count_users(db_clone_session)
     assert final_count == 500, f"Expected 500 users, got {final_count}"
 
     # Report execution time
@@ -0,0 +1,260 @@
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from src.sqlite.db import AsyncManage
+from src.sqlite.models import Product
+
+WORDS: list[str] = [
+    "red", "blue", "green", "phone", "laptop", "cable", "charger", "case",
+    "wireless", "mouse", "keyboard", "monitor", "speaker", "camera", "lamp",
+]
+
+
+def product_row(i: int) -> dict:
+    return {
+        "name": f"{WORDS[i % 15]} {WORDS[(i * 7) % 15]} {i}",
+        "price": 10.0,
+        "sku": f"SKU-SEARCH-{i}",
+        "description": (
+            f"A {WORDS[(i * 3) % 15]} item for the {WORDS[(i * 11) % 15]} "
+            f"with the code item{i}"
+        ),
+        "inventory": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_sqlite_search_products(db_clone: AsyncManage):
+    session = db_clone.async_session_maker
+    await Product.add_product(
+        session, name="Red Phone", price=100.0, sku="SKU-1",
+        description="A phone with the red case",
+    )
+    await Product.add_product(
+        session, name="Blue Laptop", price=900.0, sku="SKU-2",
+        description="A laptop without case",
+    )
+    await Product.add_product(
+        session, name="USB Cable", price=5.0, sku="SKU-3",
+        description="A cable for the red phone",
+    )
+
+    products = await Product.search_products(session, "red")
+    assert [p.sku for p in products] == ["SKU-1", "SKU-3"]
+
+    products = await Product.search_products(session, "case", limit=1)
+    assert len(products) == 1
+
+    products = await Product.search_products(session, "case", offset=1)
+    assert len(products) == 1
+
+    assert await Product.search_products(session, "keyboard") == []
+
+
+@pytest.mark.asyncio
+async def test_sqlite_search_products_sync(db_clone: AsyncManage):
+    session = db_clone.async_session_maker
+    product = await Product.add_product(
+        session, name="Red Phone", price=100.0, sku="SKU-1",
+        description="A phone",
+    )
+
+    async with session() as s:
+        async with s.begin():
+            obj = await s.get(Product, product.id)
+            obj.name = "Green Phone"
+
+    assert await Product.search_products(session, "red") == []
+    assert len(await Product.search_products(session, "green")) == 1
+
+    async with session() as s:
+        async with s.begin():
+            await s.delete(await s.get(Product, product.id))
+
+    assert await Product.search_products(session, "phone") == []
+
+
+@pytest.mark.asyncio
+async def test_sqlite_search_products_rebuild(db_clone: AsyncManage):
+    session = db_clone.async_session_maker
+    await Product.add_product(
+        session, name="Red Phone", price=100.0, sku="SKU-1",
+        description="A phone",
+    )
+
+    async with db_clone.engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO products_fts(products_fts) VALUES ('delete-all')")
+        )
+    assert await Product.search_products(session, "phone") == []
+
+    await Product.rebuild_search_index(session)
+    assert len(await Product.search_products(session, "phone")) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query,skus",
+    [
+        ("usb-c", ["SKU-1"]),
+        ("2.0", ["SKU-2"]),
+        ("red's", ["SKU-3"]),
+        ('"red', ["SKU-3"]),
+        ("cable usb-c", ["SKU-1"]),
+        ("   ", []),
+    ],
+)
+async def test_sqlite_search_products_quote(
+    db_clone: AsyncManage, query: str, skus: list[str]
+):
+    session = db_clone.async_session_maker
+    await Product.add_product(
+        session, name="USB-C Cable", price=5.0, sku="SKU-1",
+        description="A cable",
+    )
+    await Product.add_product(
+        session, name="Bluetooth 2.0 Speaker", price=20.0, sku="SKU-2",
+        description="A speaker",
+    )
+    await Product.add_product(
+        session, name="Red's Phone", price=100.0, sku="SKU-3",
+        description="A phone",
+    )
+
+    products = await Product.search_products(session, query)
+    assert [p.sku for p in products] == skus
+
+
+@pytest.mark.asyncio
+async def test_sqlite_search_products_raw(db_clone: AsyncManage):
+    session = db_clone.async_session_maker
+    await Product.add_product(
+        session, name="Red Phone", price=100.0, sku="SKU-1",
+        description="A phone",
+    )
+    await Product.add_product(
+        session, name="Blue Laptop", price=900.0, sku="SKU-2",
+        description="A laptop",
+    )
+
+    products = await Product.search_products(
+        session, "red OR laptop", raw=True
+    )
+    assert sorted(p.sku for p in products) == ["SKU-1", "SKU-2"]
+
+    # NOTE: The operator is the plain text term without the raw flag.
+    assert await Product.search_products(session, "red OR laptop") == []
+
+    with pytest.raises(OperationalError):
+        await Product.search_products(session, "usb-c", raw=True)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_search_products_existing_database(
+    db_clone: AsyncManage,
+):
+    session = db_clone.async_session_maker
+    await Product.add_product(
+        session, name="Red Phone", price=100.0, sku="SKU-1",
+        description="A phone",
+    )
+
+    # NOTE: Drop the index and its triggers like the database that created
+    #   before the search index.
+    async with db_clone.engine.begin() as conn:
+        for name in ("insert", "delete", "update"):
+            await conn.execute(text(f"DROP TRIGGER products_fts_{name}"))
+        await conn.execute(text("DROP TABLE products_fts"))
+
+    await Product.ensure_search_index(session)
+    assert len(await Product.search_products(session, "phone")) == 1
+
+    await Product.add_product(
+        session, name="Green Phone", price=100.0, sku="SKU-2",
+        description="A phone",
+    )
+    assert len(await Product.search_products(session, "phone")) == 2
+
+    # NOTE: It is safe to call again when the index already exists.
+    await Product.ensure_search_index(session)
+    assert len(await Product.search_products(session, "green")) == 1
+
+    async with db_clone.engine.begin() as conn:
+        await conn.execute(text("DROP TRIGGER products_fts_insert"))
+        await conn.execute(text("DROP TABLE products_fts"))
+    await Product.rebuild_search_index(session)
+    assert len(await Product.search_products(session, "phone")) == 2
+
+
+@pytest.mark.asyncio
+async def test_sqlite_search_products_initialize(tmp_path):
+    database = tmp_path / "existing.db"
+    conn = sqlite3.connect(database)
+    conn.executescript(
+        "CREATE TABLE products ("
+        "id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+        "price FLOAT NOT NULL, sku VARCHAR NOT NULL UNIQUE, "
+        "description VARCHAR, inventory INTEGER);"
+        "INSERT INTO products (name, price, sku, description, inventory) "
+        "VALUES ('Red Phone', 100.0, 'SKU-1', 'A phone', 1);"
+    )
+    conn.close()
+
+    manage = AsyncManage()
+    manage.init(f"sqlite+aiosqlite:///{database}")
+    await manage.initialize()
+
+    # NOTE: The existing products table gets the index and its triggers.
+    session = manage.async_session_maker
+    assert len(await Product.search_products(session, "phone")) == 1
+    await Product.add_product(
+        session, name="Green Phone", price=100.0, sku="SKU-2",
+        description="A phone",
+    )
+    assert len(await Product.search_products(session, "phone")) == 2
+
+    await manage.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_search_products_benchmark(db_clone: AsyncManage):
+    session = db_clone.async_session_maker
+    size: int = 0
+    for target in (1000, 10000, 50000):
+        async with db_clone.engine.begin() as conn:
+            await conn.execute(
+                insert(Product), [product_row(i) for i in range(size, target)]
+            )
+        size = target
+
+        like_ids: list[list[int]] = []
+        start_time = time.time()
+        for i in range(20):
+            async with session() as s:
+                like_rs = (
+                    await s.execute(
+                        select(Product)
+                        .where(Product.description.like(f"%item{i * 37}"))
+                        .limit(20)
+                    )
+                ).scalars().all()
+            like_ids.append([p.id for p in like_rs])
+        like_time = time.time() - start_time
+
+        fts_ids: list[list[int]] = []
+        start_time = time.time()
+        for i in range(20):
+            fts_rs = await Product.search_products(session, f"item{i * 37}")
+            fts_ids.append([p.id for p in fts_rs])
+        fts_time = time.time() - start_time
+
+        for i in range(20):
+            assert fts_ids[i] == like_ids[i] == [i * 37 + 1]
+        print(
+            f"Search {size} products: LIKE {like_time:.4f} seconds, "
+            f"FTS5 {fts_time:.4f} seconds"
+        )
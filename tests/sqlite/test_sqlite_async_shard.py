@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.sqlite.models import Product, User
+from src.sqlite.shard import ShardedAsyncManage
+
+
+async def add_user(manage: ShardedAsyncManage, i: int) -> None:
+    email: str = f"shard-user{i}@example.com"
+    session: AsyncSession
+    async with manage.session_maker_for(email)() as session:
+        session.add(User(name=f"User {i}", email=email))
+        await session.commit()
+
+
+def test_sqlite_shard_index_is_stable():
+    manage = ShardedAsyncManage(num_shards=8)
+    assert manage.shard_index("SKU-0001") == manage.shard_index("SKU-0001")
+    assert all(
+        0 <= manage.shard_index(f"SKU-{i}") < 8 for i in range(100)
+    )
+
+
+@pytest.mark.asyncio
+async def test_sqlite_shard_point_lookup(db_shards: ShardedAsyncManage):
+    for i in range(20):
+        sku: str = f"SKU-{i:04d}"
+        await Product.add_product(
+            db_shards.session_maker_for(sku),
+            name=f"Product {i}",
+            price=10.0,
+            sku=sku,
+            inventory=i,
+        )
+
+    product = await Product.get_product_by_sku(
+        db_shards.session_maker_for("SKU-0007"), "SKU-0007"
+    )
+    assert product.inventory == 7
+
+    # NOTE: The other shards do not keep this row.
+    found = await db_shards.fan_out(Product.get_product_by_sku, "SKU-0007")
+    assert sum(rs is not None for rs in found) == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_shard_fan_out_aggregate(
+    db_shards: ShardedAsyncManage,
+):
+    await asyncio.gather(*(add_user(db_shards, i) for i in range(40)))
+
+    counts = await db_shards.fan_out_session(User.count_users)
+    assert len(counts) == 4
+    assert await db_shards.fan_out_session(
+        User.count_users, combine=sum
+    ) == 40
+
+    for i in range(10):
+        sku: str = f"SKU-{i:04d}"
+        await Product.add_product(
+            db_shards.session_maker_for(sku),
+            name=f"Product {i}",
+            price=2.0,
+            sku=sku,
+            inventory=5,
+        )
+
+    value = await db_shards.fan_out(
+        Product.get_total_inventory_value, combine=sum
+    )
+    assert value == 100.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("db_shards", [1, 4], indirect=True)
+async def test_sqlite_shard_concurrent_write(db_shards: ShardedAsyncManage):
+    # NOTE: Warm up the connection pools of all shards before the timing.
+    await asyncio.gather(*(add_user(db_shards, i) for i in range(200)))
+
+    start_time = time.time()
+    await asyncio.gather(*(add_user(db_shards, i) for i in range(200, 600)))
+    execution_time = time.time() - start_time
+
+    assert await db_shards.fan_out_session(
+        User.count_users, combine=sum
+    ) == 600
+    print(
+        f"Executed 400 concurrent writes on {db_shards.num_shards} shard(s) "
+        f"in {execution_time:.2f} seconds"
+    )
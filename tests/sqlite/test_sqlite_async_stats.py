@@ -0,0 +1,200 @@
+import asyncio
+
+import pytest
+from sqlalchemy import insert, text
+
+from src.exceptions import DatabaseManageException
+from src.sqlite.db import AsyncManage
+from src.sqlite.models import User
+
+
+async def add_users(manage: AsyncManage, start_id: int, count: int) -> None:
+    async with manage.async_session_maker() as session:
+        session.add_all(
+            [
+                User(name=f"User {i}", email=f"stats{i}@example.com")
+                for i in range(start_id, start_id + count)
+            ]
+        )
+        await session.commit()
+
+
+async def add_raw_user(manage: AsyncManage, i: int) -> None:
+    """Add the user with the raw driver connection that does not go through
+    the engine events.
+    """
+    async with manage.engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.execute(
+            "INSERT INTO users (name, email) VALUES (?, ?)",
+            (f"Raw {i}", f"raw{i}@example.com"),
+        )
+        await raw.driver_connection.commit()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_count_exact(db_clone: AsyncManage):
+    await add_users(db_clone, 1, 10)
+    assert await db_clone.count(User) == 10
+
+    with pytest.raises(DatabaseManageException):
+        await db_clone.count(User, mode="unknown")
+
+
+@pytest.mark.asyncio
+async def test_sqlite_count_cached(db_clone: AsyncManage):
+    await add_users(db_clone, 1, 10)
+    assert await db_clone.count(User, mode="cached") == 10
+
+    # NOTE: The raw write does not go through the engine, so the cached count
+    #   does not change until it expires.
+    await add_raw_user(db_clone, 1)
+    assert await db_clone.count(User, mode="cached") == 10
+
+    # NOTE: The write path of the engine invalidate the cached count.
+    await add_users(db_clone, 11, 5)
+    assert await db_clone.count(User, mode="cached") == 16
+
+    # NOTE: The rollback does not invalidate the cached count.
+    async with db_clone.async_session_maker() as session:
+        session.add(User(name="Rollback", email="rollback@example.com"))
+        await session.flush()
+        await session.rollback()
+    assert await db_clone.count(User, mode="cached") == 16
+
+
+@pytest.mark.asyncio
+async def test_sqlite_count_cached_textual_write(db_clone: AsyncManage):
+    assert await db_clone.count(User, mode="cached") == 0
+
+    async with db_clone.engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO users (name, email) "
+                "VALUES ('Text', 'text@example.com')"
+            )
+        )
+    assert await db_clone.count(User, mode="cached") == 1
+    assert db_clone.row_counter.writes == 1
+
+    async with db_clone.engine.begin() as conn:
+        await conn.exec_driver_sql("DELETE FROM users")
+    assert await db_clone.count(User, mode="cached") == 0
+    assert db_clone.row_counter.writes == 2
+
+
+@pytest.mark.asyncio
+async def test_sqlite_count_cached_concurrent_write(
+    db_clone: AsyncManage, monkeypatch
+):
+    await add_users(db_clone, 1, 10)
+    counter = db_clone.row_counter
+    exact = counter._exact
+
+    async def exact_with_write(session, model) -> int:
+        rs: int = await exact(session, model)
+        # NOTE: The concurrent commit invalidate the count after it reads.
+        await add_users(db_clone, 11, 1)
+        return rs
+
+    monkeypatch.setattr(counter, "_exact", exact_with_write)
+    assert await db_clone.count(User, mode="cached") == 10
+    monkeypatch.setattr(counter, "_exact", exact)
+
+    # NOTE: The stale count does not store to the cache.
+    assert await db_clone.count(User, mode="cached") == 11
+
+
+@pytest.mark.asyncio
+async def test_sqlite_count_cached_ttl(db_clone: AsyncManage):
+    db_clone.row_counter.ttl = 0.05
+    await add_users(db_clone, 1, 10)
+    assert await db_clone.count(User, mode="cached") == 10
+
+    await add_raw_user(db_clone, 1)
+    assert await db_clone.count(User, mode="cached") == 10
+
+    await asyncio.sleep(0.1)
+    assert await db_clone.count(User, mode="cached") == 11
+
+
+@pytest.mark.asyncio
+async def test_sqlite_count_cached_batch(db_clone: AsyncManage):
+    await add_users(db_clone, 1, 10)
+    assert await db_clone.count(User, mode="cached") == 10
+
+    await db_clone.execute_batch(
+        ["INSERT INTO users (name, email) VALUES ('Raw', 'raw@example.com')"]
+    )
+    assert await db_clone.count(User, mode="cached") == 11
+
+
+@pytest.mark.asyncio
+async def test_sqlite_count_approximate(db_clone: AsyncManage):
+    await add_users(db_clone, 1, 10)
+
+    # NOTE: Fall back to the exact count before the first ANALYZE.
+    assert await db_clone.count(User, mode="approximate") == 10
+    assert db_clone.row_counter.writes == 10
+
+    await db_clone.analyze()
+    assert db_clone.row_counter.writes == 0
+
+    async with db_clone.engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {"name": f"User {i}", "email": f"stats{i}@example.com"}
+                for i in range(11, 21)
+            ],
+        )
+
+    # NOTE: The approximate count is the row count of the last ANALYZE.
+    assert await db_clone.count(User, mode="approximate") == 10
+    assert await db_clone.count(User) == 20
+
+
+@pytest.mark.asyncio
+@pytest.mark.db_clone(
+    count_ttl=5.0, analyze_threshold=5, analyze_interval=0.05
+)
+async def test_sqlite_analyze_scheduler(db_clone: AsyncManage):
+    assert db_clone.row_counter.ttl == 5.0
+
+    await add_users(db_clone, 1, 3)
+    await asyncio.sleep(0.15)
+    assert db_clone.row_counter.writes == 3
+
+    await add_users(db_clone, 4, 3)
+    await asyncio.sleep(0.15)
+    assert db_clone.row_counter.writes == 0
+
+    async with db_clone.engine.connect() as conn:
+        rs = await conn.execute(
+            text("SELECT stat FROM sqlite_stat1 WHERE tbl = 'users'")
+        )
+        assert rs.scalars().first().split()[0] == "6"
+    assert await db_clone.count(User, mode="approximate") == 6
+
+
+@pytest.mark.asyncio
+@pytest.mark.db_clone(analyze_threshold=1, analyze_interval=0.05)
+async def test_sqlite_analyze_scheduler_retry(db_clone: AsyncManage, caplog):
+    analyze = db_clone.analyze
+    calls: list[int] = []
+
+    async def failed_once() -> None:
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("Refresh failed")
+        await analyze()
+
+    db_clone.analyze = failed_once
+    await add_users(db_clone, 1, 1)
+    await asyncio.sleep(0.2)
+
+    # NOTE: The scheduler logs the failure and retries on the next interval.
+    assert "Background statistics refresh failed" in caplog.text
+    assert len(calls) >= 2
+    assert db_clone.row_counter.writes == 0
+    assert not db_clone._analyze_task.done()